@@ -1,7 +1,15 @@
+import json
+import math
 import os
-from flask import Flask, request, jsonify
+import queue
+import threading
+import time
+from contextvars import ContextVar, copy_context
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from urllib.parse import urlparse
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -17,11 +25,13 @@ if not api_key:
     api_key = "#############################"
     print("WARNING: PERPLEXITY_API_KEY environment variable not set. Using placeholder.")
 
-# Initialize OpenAI client with Perplexity base URL
-client = OpenAI(
-    api_key=api_key,
-    base_url="https://api.perplexity.ai"
-)
+# Perplexity is the default LLM endpoint; see LLM_ENDPOINTS to add or replace it
+PERPLEXITY_ENDPOINT = {
+    "name": "perplexity",
+    "base_url": "https://api.perplexity.ai",
+    "api_key": api_key,
+    "model": "sonar",  # Perplexity's sonar model
+}
 
 
 # System instruction for the AI
@@ -87,14 +97,18 @@ Write like you're WARNING A FRIEND, not writing a legal document.
 """
 
 def get_working_response(text_content):
-    """Generate summary using Perplexity API"""
+    """
+    Generate summary using Perplexity API
+
+    Raises LLMRateLimitError / LLMUnavailableError rather than returning
+    an error message, so a failure is never saved as a summary
+    """
     try:
         print(f"Generating summary with Perplexity...")
         
         # Use Perplexity's sonar model via OpenAI-compatible API
-        response = client.chat.completions.create(
-            model='sonar',  # Perplexity's sonar model
-            messages=[
+        return complete(
+            [
                 {"role": "system", "content": SYSTEM_INSTRUCTION},
                 {"role": "user", "content": text_content}
             ],
@@ -102,73 +116,40 @@ def get_working_response(text_content):
             max_tokens=8192,
         )
         
-        return response.choices[0].message.content
-        
+    except LLMRateLimitError:
+        print("⚠️ API quota exceeded. Please wait or try again later.")
+        raise
+    except LLMError:
+        raise
     except Exception as e:
-        error_msg = str(e)
         print(f"Error generating content: {e}")
         
-        # Check if it's a quota error
-        if "429" in error_msg or "rate" in error_msg.lower():
-            print("⚠️ API quota exceeded. Please wait or try again later.")
-            return """# API Quota Exceeded
-
-Unfortunately, the Perplexity API quota has been exceeded. 
-
-## What this means:
-- The API has rate limits
-- You need to wait before trying again
-- Or upgrade to a higher tier plan
-
-## Temporary Summary:
-🚫 **Unable to generate AI summary due to API limits**
-
-Please try again in a few minutes, or check your API usage at:
-https://www.perplexity.ai/settings/api
-
-For now, you can:
-- Wait a minute and try again
-- Use a different API key
-- Upgrade your Perplexity API plan
-"""
-        
         # Try with a simpler request as fallback
         try:
             print("Trying fallback with shorter content...")
-            response = client.chat.completions.create(
-                model='sonar',
-                messages=[
+            # Condensed chunk by chunk rather than truncated, so nothing is dropped
+            shorter_content = condense_policy_text(text_content, max_tokens=Config.SUMMARY_CHUNK_TOKENS)
+            return complete(
+                [
                     {"role": "system", "content": SYSTEM_INSTRUCTION},
-                    {"role": "user", "content": text_content[:10000]}  # Limit text size
+                    {"role": "user", "content": shorter_content}
                 ],
                 temperature=0.3,
                 max_tokens=2000,
             )
-            return response.choices[0].message.content
+        except LLMError:
+            raise
         except Exception as e2:
             print(f"Fallback also failed: {e2}")
-            # Return a helpful error message instead of crashing
-            return """# Summary Generation Failed
-
-Unable to generate AI summary at this time.
-
-**Possible reasons:**
-- API quota exceeded (wait a few minutes)
-- Model unavailable
-- Network issues
-- Invalid API key
-
-**What you can do:**
-1. Wait a minute and try again
-2. Check your API key and quota
-3. Try uploading a smaller policy file
-
-Visit: https://www.perplexity.ai/settings/api to check your API usage
-"""
+            raise LLMUnavailableError(f"Summary generation failed: {e2}") from e2
 
 
 def generate_short_summary(text_content):
-    """Generate 50-word summary for extension"""
+    """
+    Generate 50-word summary for extension (text already condensed to the input budget)
+
+    Raises LLMError on failure, like get_working_response
+    """
     try:
         print("Generating 50-word summary...")
         
@@ -176,34 +157,166 @@ def generate_short_summary(text_content):
 Focus on the most critical privacy concerns. Use emojis: 🚫 for critical issues, ⚠️ for concerns.
 
 Policy text:
-{text_content[:5000]}  
+{text_content}
 
 Provide ONLY the summary, nothing else."""
 
-        response = client.chat.completions.create(
-            model='sonar',  # Perplexity's sonar model
-            messages=[
+        return complete(
+            [
                 {"role": "user", "content": short_prompt}
             ],
             temperature=0.3,
             max_tokens=200,
-        )
-        
-        return response.choices[0].message.content.strip()
+        ).strip()
+    except LLMError:
+        raise
     except Exception as e:
-        error_msg = str(e)
         print(f"Error generating short summary: {e}")
-        
-        # Return helpful error message
-        if "429" in error_msg or "rate" in error_msg.lower():
-            return "⚠️ API quota exceeded. Please wait 1 minute and try again."
-        else:
-            return "⚠️ Unable to generate summary. Please try again later."
+        raise LLMUnavailableError(f"Short summary generation failed: {e}") from e
+
+# Structured mode: one call returns both tiers as JSON
+SUMMARY_SECTIONS = {
+    'critical': ('🚫', '🚫 CRITICAL ISSUES (Deal Breakers)'),
+    'concerning': ('⚠️', '⚠️ CONCERNING PRACTICES (Think Twice)'),
+    'good': ('✅', '✅ GOOD THINGS (Your Rights)'),
+    'standard': ('ℹ️', 'ℹ️ STANDARD STUFF (Normal for Most Services)'),
+}
+
+STRUCTURED_INSTRUCTION = """You are a Privacy Rights Advocate helping everyday people understand complex legal policies.
+
+Analyze the Terms of Service or Privacy Policy and return JSON with:
+- short_summary: EXACTLY 50 words or less on the most critical privacy concerns. Use emojis: 🚫 for critical issues, ⚠️ for concerns.
+- critical: the most serious privacy violations or unfair terms (deal breakers)
+- concerning: problematic but common practices (think twice)
+- good: user protections and rights
+- standard: typical industry practices (normal for most services)
+
+Each list item is ONE clear sentence, without a leading emoji or bullet.
+
+**RULES FOR WRITING:**
+1. Use SIMPLE words - pretend you're explaining to a friend over coffee
+2. NO legal jargon - say "they can read your messages" not "access to user communications"
+3. Be SPECIFIC - say "Facebook tracks you on other websites" not "third-party tracking occurs"
+4. Be DIRECT - say "Your deleted photos aren't really deleted" not "data retention policies apply"
+5. Focus on what ACTUALLY affects users' privacy and rights
+6. Maximum 1000 words total
+
+Write like you're WARNING A FRIEND, not writing a legal document.
+"""
+
+STRUCTURED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "short_summary": {"type": "string"},
+        **{name: {"type": "array", "items": {"type": "string"}} for name in SUMMARY_SECTIONS},
+    },
+    "required": ["short_summary", *SUMMARY_SECTIONS],
+}
+
+
+def render_summary_markdown(sections):
+    """Full summary markdown in the same format SYSTEM_INSTRUCTION asks for"""
+    lines = ["# What You Need to Know", ""]
+    for name, (emoji, _) in SUMMARY_SECTIONS.items():
+        lines.append(f"## {sections[name]['header']}")
+        lines.extend(f"{emoji} {point}" for point in sections[name]['points'])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_structured_summary(text_content):
+    """
+    Generate both summary tiers with one call (SUMMARY_MODE=structured)
+
+    Returns {'short_summary', 'full_summary', 'sections'}, or None if the
+    call fails or the reply doesn't match the schema, so the caller can
+    fall back to the two-call path. LLMError (rate limited, provider
+    down) is raised instead, since the fallback would fail the same way.
+    """
+    try:
+        print("Generating structured summary with Perplexity...")
+        content = complete(
+            [
+                {"role": "system", "content": STRUCTURED_INSTRUCTION},
+                {"role": "user", "content": text_content}
+            ],
+            temperature=0.3,
+            max_tokens=8192,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"schema": STRUCTURED_SCHEMA},
+            },
+            validate=lambda reply: parse_structured_reply(reply) is not None,
+        )
+        result = parse_structured_reply(content)
+        if result is None:
+            print("Structured summary was empty or malformed")
+        return result
+    except LLMError:
+        raise
+    except Exception as e:
+        print(f"Error generating structured summary: {e}")
+        return None
+
+
+def parse_structured_reply(content):
+    """Summary dict from a structured-mode reply, or None if it doesn't fit the schema"""
+    try:
+        # Tolerate a reply wrapped in prose or code fences
+        data = json.loads(content[content.find('{'):content.rfind('}') + 1])
+
+        short_summary = str(data.get('short_summary', '')).strip()
+        sections = {}
+        for name, (_, header) in SUMMARY_SECTIONS.items():
+            points = data.get(name) or []
+            if not isinstance(points, list):
+                points = [points]
+            sections[name] = {
+                'header': header,
+                'points': [str(p).strip() for p in points if str(p).strip()],
+            }
+        if not short_summary or not any(s['points'] for s in sections.values()):
+            return None
+
+        return {
+            'short_summary': short_summary,
+            'full_summary': render_summary_markdown(sections),
+            'sections': sections,
+        }
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+# Canned messages older versions of the generators returned (and saved) on failure
+FAILED_SUMMARY_PREFIXES = (
+    "# API Quota Exceeded",
+    "# Summary Generation Failed",
+    "⚠️ API quota exceeded",
+    "⚠️ Unable to generate summary",
+)
+
+
+def is_failed_summary(summary_text):
+    """True if the text is one of those error placeholders"""
+    return (summary_text or "").startswith(FAILED_SUMMARY_PREFIXES)
+
+
+def is_usable(summary):
+    """A stored summary that can be served (not a saved error placeholder)"""
+    return bool(summary) and not (is_failed_summary(summary.get('short_summary'))
+                                  or is_failed_summary(summary.get('full_summary')))
 
 # Import policy fetcher and database system
-from policy_fetcher_safe import fetch_policy_for_url
+from policy_fetcher_safe import fetch_policy_for_url, get_fetcher_stats, request_origin
 from database import get_database
 from config.config import Config
+from services.chunker import chunk_policy_text, estimate_tokens
+from services.job_queue import get_job_queue
+from services.llm_cache import get_llm_cache, make_key
+from services.llm_router import get_llm_router, load_endpoints
+from services.refresh_ahead import get_refresh_ahead
+from services.rate_limiter import LLMError, LLMRateLimitError, LLMUnavailableError, rate_limiter_stats
+from services.single_flight import get_single_flight
 
 # Initialize database based on configuration
 if Config.DB_TYPE.lower() == 'dynamodb':
@@ -221,6 +334,246 @@ else:
 
 print(f"💾 Cache enabled: {Config.CACHE_ENABLED}")
 
+# Concurrent misses for one site share a single fetch + summarize
+single_flight = get_single_flight(Config.SINGLE_FLIGHT_LOCK_DIR or None)
+
+# Identical LLM calls (same model, prompt, parameters and text) are answered from disk
+llm_cache = get_llm_cache(
+    storage_file=Config.LLM_CACHE_FILE,
+    max_entries=Config.LLM_CACHE_MAX_ENTRIES
+) if Config.LLM_CACHE_ENABLED else None
+
+PROMPT_VERSION = "1"  # Bump when reply handling changes, to invalidate cached replies
+
+# Every LLM call goes through the router: per-endpoint timeouts and budgets
+# (request/token buckets that own retries and backoff), hedging past p95
+llm = get_llm_router(
+    load_endpoints(
+        Config.LLM_ENDPOINTS,
+        default=PERPLEXITY_ENDPOINT,
+        timeout=Config.LLM_TIMEOUT,
+        requests_per_minute=Config.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=Config.LLM_TOKENS_PER_MINUTE,
+        max_retries=Config.LLM_MAX_RETRIES,
+        max_wait=Config.LLM_MAX_WAIT
+    ),
+    hedge=Config.LLM_HEDGE,
+    min_samples=Config.LLM_HEDGE_MIN_SAMPLES,
+    # Each call may have a hedge in flight
+    max_workers=2 * (Config.SUMMARY_WORKERS + Config.SUMMARY_MAP_WORKERS)
+)
+print(f"🤖 LLM endpoints: {', '.join(f'{e.name} ({e.model})' for e in llm.endpoints)}")
+
+
+# Set by a caller that needs to know what a piece of work cost (refresh-ahead):
+# a list that every LLM call made on its behalf appends its token count to
+llm_usage = ContextVar('llm_usage', default=None)
+
+
+class ContextPool(ThreadPoolExecutor):
+    """Thread pool whose tasks run in the submitter's context, so llm_usage follows them"""
+    
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def complete(messages, validate=None, **params):
+    """
+    Reply text of one chat completion, shared by every non-streaming call
+
+    Served from llm_cache when the same call was made before. Only
+    successful replies are cached (errors raise before reaching it), and
+    with `validate` only replies it accepts, so a malformed answer is
+    retried next time rather than replayed.
+    
+    Calls go through the llm router: raises LLMRateLimitError or
+    LLMUnavailableError once every endpoint has used up its retries.
+    """
+    key = make_key(llm.models, messages, params, PROMPT_VERSION) if llm_cache else None
+    if key:
+        content = llm_cache.get(key)
+        if content is not None:
+            print("⚡ LLM cache hit")
+            return content
+
+    response = llm.complete(messages, **params)
+    content = response.choices[0].message.content or ""
+    if getattr(response, 'usage', None):
+        print(f"LLM tokens: {response.usage.prompt_tokens} in, {response.usage.completion_tokens} out")
+        usage = llm_usage.get()
+        if usage is not None:
+            usage.append(response.usage.prompt_tokens + response.usage.completion_tokens)
+
+    if key and content.strip() and (validate is None or validate(content)):
+        llm_cache.set(key, content)
+    return content
+
+
+# Short and full summaries are generated side by side
+summary_pool = ContextPool(max_workers=Config.SUMMARY_WORKERS, thread_name_prefix="summary")
+
+FULL_SUMMARY_PENDING = """# Summary In Progress
+
+The full analysis is still being generated. Check back in a few seconds.
+"""
+
+# Left in place of a pending full summary that failed; is_usable() rejects it,
+# so the next request regenerates the entry (and keeps its hit count)
+FULL_SUMMARY_FAILED = """# Summary Generation Failed
+
+The full analysis could not be generated. Request this site again to retry.
+"""
+
+
+# Long policies are condensed chunk by chunk (map) before summarizing (reduce)
+map_pool = ContextPool(max_workers=Config.SUMMARY_MAP_WORKERS, thread_name_prefix="summary-map")
+
+MAP_INSTRUCTION = """You are helping summarize a long privacy policy or terms of service, one part at a time.
+
+List every point in this part that affects users' privacy or rights, as short plain-English bullets under these headings:
+CRITICAL, CONCERNING, GOOD, STANDARD
+
+Keep specifics: what data, who it is shared with, how long it is kept, what users can do.
+Skip boilerplate and repetition. Output ONLY the headings and bullets."""
+
+MAX_CONDENSE_ROUNDS = 3  # each round shrinks the text several-fold
+
+
+def extract_key_points(chunk):
+    """Map step: the user-relevant points from one chunk of a policy"""
+    return complete(
+        [
+            {"role": "system", "content": MAP_INSTRUCTION},
+            {"role": "user", "content": chunk}
+        ],
+        temperature=0.2,
+        max_tokens=1500,
+    ).strip()
+
+
+def condense_policy_text(text_content, max_tokens=None, deadline=None):
+    """
+    Text that fits in one summary call, covering the whole policy
+
+    Text over max_tokens (SUMMARY_INPUT_TOKENS) is split into
+    SUMMARY_CHUNK_TOKENS chunks on policy markers and headings. Key
+    points are extracted from the chunks in parallel on map_pool, and the
+    notes, grouped back under their policy markers, replace the text.
+    Repeats while the notes are still too long. A chunk that fails or
+    misses the deadline is left out; if every chunk fails the text is
+    returned unchanged so the caller's own error handling applies.
+    """
+    max_tokens = max_tokens or Config.SUMMARY_INPUT_TOKENS
+    for _ in range(MAX_CONDENSE_ROUNDS):
+        tokens = estimate_tokens(text_content)
+        if tokens <= max_tokens:
+            break
+        chunks = chunk_policy_text(text_content, min(Config.SUMMARY_CHUNK_TOKENS, max_tokens))
+        print(f"📚 Long policy (~{tokens} tokens): condensing {len(chunks)} chunks...")
+        started = time.time()
+        futures = [map_pool.submit(extract_key_points, chunk) for _, chunk in chunks]
+
+        notes = {}  # policy_type -> [points per chunk], in document order
+        for (policy_type, chunk), future in zip(chunks, futures):
+            try:
+                timeout = None if deadline is None else max(deadline - time.time(), 0)
+                notes.setdefault(policy_type, []).append(future.result(timeout=timeout))
+            except Exception as e:
+                future.cancel()
+                header = chunk.partition("\n")[0]
+                print(f"Error condensing {header}: {e}")
+        if not notes:
+            break
+
+        text_content = "".join(
+            f"\n\n=== {policy_type.upper() or 'UPLOADED'} POLICY ===\n\n" + "\n\n".join(points)
+            for policy_type, points in notes.items()
+        )
+        print(f"⏱️  Condensed to ~{estimate_tokens(text_content)} tokens in {time.time() - started:.1f}s")
+    return text_content
+
+
+def _timed(generate, text_content):
+    """Run a generator, returning (result, seconds)"""
+    start = time.time()
+    return generate(text_content), time.time() - start
+
+
+def start_summaries(text_content):
+    """Issue both LLM calls at once; returns (short_future, full_future)"""
+    return (
+        summary_pool.submit(_timed, generate_short_summary, text_content),
+        summary_pool.submit(_timed, get_working_response, text_content),
+    )
+
+
+def wait_for_summary(future, deadline, label):
+    """
+    Result of a summary future
+    
+    Raises LLMUnavailableError once the shared deadline passes, and passes
+    on the generator's own LLMError
+    """
+    try:
+        result, elapsed = future.result(timeout=max(deadline - time.time(), 0))
+        print(f"⏱️  {label} summary: {elapsed:.1f}s")
+        return result
+    except FuturesTimeout:
+        print(f"⏱️  {label} summary timed out after {Config.SUMMARY_TIMEOUT}s")
+        raise LLMUnavailableError(
+            f"{label} summary timed out after {Config.SUMMARY_TIMEOUT}s",
+            retry_after=Config.LLM_FAILURE_TTL
+        ) from None
+
+
+# Sites whose last summary attempt failed: site -> (expires, body).
+# Requests inside that window get the same 503 without fetching or calling the LLM.
+recent_failures = {}
+recent_failures_lock = threading.Lock()
+
+
+def failure_body(error, ttl=None):
+    """503 body for an LLMError; retry_after is `ttl` or the error's own hint"""
+    ttl = ttl if ttl is not None else max(error.retry_after or 0, 1)
+    return {
+        "error": "Rate limited" if isinstance(error, LLMRateLimitError) else "Summary service unavailable",
+        "message": str(error),
+        "retry_after": int(math.ceil(ttl))
+    }
+
+
+def remember_failure(site, error):
+    """503 body for a failed generation, remembered for a short negative TTL"""
+    ttl = max(Config.LLM_FAILURE_TTL, error.retry_after or 0)
+    body = failure_body(error, ttl)
+    now = time.time()
+    with recent_failures_lock:
+        # Pruned on write too: a bulk run fails on many sites that are never asked for again
+        for key in [k for k, (expires, _) in recent_failures.items() if expires <= now]:
+            del recent_failures[key]
+        recent_failures[db.normalize_url(site)] = (now + ttl, body)
+    print(f"⛔ Summary failed for {site} ({error}); retry in {body['retry_after']}s")
+    return body
+
+
+def recent_failure(site):
+    """The remembered 503 body for a site, with retry_after counting down, or None"""
+    key = db.normalize_url(site)
+    with recent_failures_lock:
+        expires, body = recent_failures.get(key, (0, None))
+        if expires <= time.time():
+            recent_failures.pop(key, None)
+            return None
+    return dict(body, retry_after=int(math.ceil(expires - time.time())))
+
+
+def api_response(body, status):
+    """jsonify(body), status; 503s carry the body's retry_after as a Retry-After header"""
+    response = jsonify(body)
+    if status == 503 and body.get('retry_after') is not None:
+        response.headers['Retry-After'] = str(body['retry_after'])
+    return response, status
+
 
 @app.route('/summarize', methods=['POST'])
 def summarize():
@@ -235,13 +588,284 @@ def summarize():
         if len(text_content) > 1000000: # 1MB text limit for safety
              return jsonify({"error": "Text content too large (max 1MB)"}), 413
 
-        summary_text = get_working_response(text_content)
+        summary_text = get_working_response(condense_policy_text(text_content))
         return jsonify({"summary": summary_text})
 
+    except LLMError as e:
+        print(f"⛔ Summary failed: {e}")
+        return api_response(failure_body(e), 503)
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+def cached_response(summary, **extra):
+    """Response body for a summary served from the database"""
+    return {
+        "id": summary['id'],
+        "short_summary": summary['short_summary'],
+        "url": summary['url'],
+        "policy_types": summary.get('policy_types', []),
+        "status": "success",
+        "cached": True,
+        "cached_at": summary.get('created_at', 'N/A'),
+        **extra
+    }
+
+
+def combine_policies(policy_data):
+    """All found policies as one text, each under its === TYPE POLICY === marker"""
+    combined_text = ""
+    for policy_type in policy_data['found_types']:
+        combined_text += f"\n\n=== {policy_type.upper()} POLICY ===\n\n"
+        combined_text += policy_data['policies'][policy_type]
+    return combined_text
+
+
+def fetch_and_summarize_site(url, origin, fast=False):
+    """
+    Cache-miss path: fetch a site's policies, summarize and save them
+    
+    Returns (response_body, status_code); raises LLMError if summarizing
+    fails, and nothing is saved
+    """
+    # Not in cache or force refresh - proceed with fetching and summarizing
+    print(f"🌐 Fetching policies for: {url}")
+    
+    # Fetch policies
+    policy_data = fetch_policy_for_url(origin)
+    
+    if not policy_data['found_types']:
+        return {
+            "error": "No policies found",
+            "message": f"Could not find privacy policy, terms, or cookies policy for {url}"
+        }, 404
+    
+    # Combine all found policies
+    combined_text = combine_policies(policy_data)
+    
+    print(f"✅ Found {len(policy_data['found_types'])} policies")
+    
+    # Expired or force-refreshed entry whose policy text hasn't changed:
+    # keep its summaries and just mark it fresh (no LLM calls)
+    content_hash = db.generate_content_hash(combined_text)
+    if Config.CACHE_ENABLED:
+        previous = db.get_summary_by_url(policy_data['url'])
+        if previous and previous.get('content_hash') == content_hash:
+            db.touch_summary(previous['id'])
+            print(f"♻️  Policy text unchanged - reusing summaries for: {policy_data['url']}")
+            print(f"💰 Tokens saved by content hash!")
+            
+            return cached_response(previous, unchanged=True), 200
+    
+    print(f"📝 Generating summaries...")
+    
+    started = time.time()
+    deadline = started + Config.SUMMARY_TIMEOUT
+    
+    # Long policies are map-reduced to fit one call (the hash stays on the full text)
+    summary_input = condense_policy_text(combined_text, deadline=deadline)
+    
+    def store(short_summary, full_summary, sections=None):
+        # Only finished summaries are pinned to this text by its hash
+        return db.save_summary(
+            url=policy_data['url'],
+            short_summary=short_summary,
+            full_summary=full_summary,
+            policy_types=policy_data['found_types'],
+            content_hash=None if full_summary in (FULL_SUMMARY_PENDING, FULL_SUMMARY_FAILED) else content_hash,
+            sections=sections
+        )
+    
+    # One call for both tiers; falls back to two calls if it fails
+    structured = None
+    if Config.SUMMARY_MODE == 'structured':
+        structured = wait_for_summary(
+            summary_pool.submit(_timed, generate_structured_summary, summary_input),
+            deadline, "Structured"
+        )
+    
+    if structured:
+        fast = False  # both tiers arrive together
+        short_summary = structured['short_summary']
+        summary_id = store(short_summary, structured['full_summary'], structured['sections'])
+    else:
+        # Generate both summaries concurrently under one deadline
+        short_future, full_future = start_summaries(summary_input)
+        try:
+            short_summary = wait_for_summary(short_future, deadline, "Short")
+        except LLMError:
+            full_future.cancel()
+            raise
+        
+        if fast:
+            # Answer with the short summary now; the full one is saved when ready.
+            # A done-callback (not another pool task) so waiting never holds a worker.
+            # A refreshed entry keeps serving its previous summaries until then.
+            previous = db.get_summary_by_url(policy_data['url'])
+            if is_usable(previous) and previous.get('full_summary') != FULL_SUMMARY_PENDING:
+                summary_id = previous['id']
+            else:
+                previous = None
+                summary_id = store(short_summary, FULL_SUMMARY_PENDING)
+            
+            def fill_in_full_summary(future):
+                try:
+                    full_summary = wait_for_summary(future, time.time(), "Full")
+                except Exception as e:
+                    # A previous entry was never touched; a new one is marked failed
+                    # (not deleted) so the next request regenerates it
+                    if previous is None:
+                        store(short_summary, FULL_SUMMARY_FAILED)
+                    if isinstance(e, LLMError):
+                        remember_failure(policy_data['url'], e)
+                    else:
+                        print(f"Error generating full summary: {e}")
+                    return
+                store(short_summary, full_summary)
+                print(f"💾 Full summary filled in for: {policy_data['url']} "
+                      f"({time.time() - started:.1f}s after request)")
+            
+            full_future.add_done_callback(fill_in_full_summary)
+            print(f"⏱️  Responded after {time.time() - started:.1f}s (fast mode, full summary pending)")
+        else:
+            full_summary = wait_for_summary(full_future, deadline, "Full")
+            print(f"⏱️  Both summaries in {time.time() - started:.1f}s")
+            summary_id = store(short_summary, full_summary)
+    
+    print(f"💾 Saved with ID: {summary_id}")
+    
+    return {
+        "id": summary_id,
+        "short_summary": short_summary,
+        "url": policy_data['url'],
+        "policy_types": policy_data['found_types'],
+        "status": "success",
+        "cached": False,
+        "full_summary_pending": fast
+    }, 200
+
+
+def saved_since(site, requested_at):
+    """
+    single_flight recheck: another worker process summarized this site
+    while we waited for its lock, so use its summary
+    """
+    summary = db.get_summary_by_url(site)
+    if is_usable(summary) and summary.get('timestamp', '') >= requested_at:
+        return cached_response(summary), 200
+    return None
+
+
+def run_fetch_and_summarize(payload):
+    """
+    The cache-miss path, coalesced per site (see SINGLE_FLIGHT_*)
+    
+    payload: {url, origin, site, fast, requested_at}; also the job payload
+    Returns (response_body, status_code); 503 with retry_after if the LLM
+    failed within the last LLM_FAILURE_TTL seconds
+    """
+    site = payload['site']
+    
+    failure = recent_failure(site)
+    if failure:
+        print(f"⛔ Recent failure for {site} - retry in {failure['retry_after']}s")
+        return failure, 503
+    
+    try:
+        (body, status), shared = single_flight.do(
+            db.normalize_url(site),
+            lambda: fetch_and_summarize_site(payload['url'], payload['origin'], payload['fast']),
+            timeout=Config.SINGLE_FLIGHT_WAIT,
+            recheck=lambda: saved_since(site, payload['requested_at'])
+        )
+    except LLMError as e:
+        return remember_failure(site, e), 503
+    if shared:
+        print(f"🤝 Coalesced with an in-flight request for: {site}")
+        body = dict(body, coalesced=True)
+    return body, status
+
+
+def job_queue():
+    """Job queue for async fetch-and-summarize; its workers start on first use"""
+    return get_job_queue(
+        handler=run_fetch_and_summarize,
+        storage_file=Config.JOB_QUEUE_FILE,
+        workers=Config.JOB_WORKERS,
+        retention_hours=Config.JOB_RETENTION_HOURS
+    )
+
+
+def lookup_cached_summary(site):
+    """
+    Cached summary for a site, or None
+    
+    With CACHE_STALE_WHILE_REVALIDATE, entries past CACHE_EXPIRY_DAYS but
+    not CACHE_HARD_EXPIRY_DAYS come back marked stale=True; the caller
+    serves them and refreshes in the background.
+    """
+    return db.get_summary_by_url(
+        site,
+        expiry_days=Config.CACHE_EXPIRY_DAYS,
+        hard_expiry_days=Config.CACHE_HARD_EXPIRY_DAYS if Config.CACHE_STALE_WHILE_REVALIDATE else None
+    )
+
+
+def refresh_in_background(payload):
+    """
+    Queue a refresh of a stale entry; returns its job
+    
+    The job queue returns the pending job if this site already has one, and
+    the job runs through single_flight like any other miss, so concurrent
+    stale hits (and foreground misses) share one fetch + summarize.
+    """
+    job = job_queue().submit(payload, key=db.normalize_url(payload['site']))
+    print(f"🔁 Background refresh {job['id']} ({job['status']}) for: {payload['site']}")
+    return job
+
+
+def refresh_popular(summary):
+    """
+    Refresh-ahead: re-fetch (and, if changed, re-summarize) one popular entry
+    
+    Returns (response_body, status_code, LLM tokens the refresh used)
+    """
+    origin = request_origin(summary['url'])
+    usage = []
+    token = llm_usage.set(usage)
+    try:
+        body, status = run_fetch_and_summarize({
+            'url': summary['url'], 'origin': origin, 'site': urlparse(origin).netloc,
+            'fast': False, 'requested_at': datetime.now().isoformat()
+        })
+    finally:
+        llm_usage.reset(token)
+    return body, status, sum(usage)
+
+
+def refresh_ahead():
+    """Refresh-ahead scheduler; its thread starts on first use"""
+    return get_refresh_ahead(
+        popular=db.get_popular,
+        refresh=refresh_popular,
+        expiry_days=Config.CACHE_EXPIRY_DAYS,
+        lead_days=Config.REFRESH_AHEAD_LEAD_DAYS,
+        top_n=Config.REFRESH_AHEAD_TOP_N,
+        tokens_per_hour=Config.REFRESH_AHEAD_TOKENS_PER_HOUR,
+        tokens_per_refresh=Config.REFRESH_AHEAD_TOKENS_PER_REFRESH,
+        interval=Config.REFRESH_AHEAD_INTERVAL
+    )
+
+
+@app.before_request
+def start_background_workers():
+    # Started by the first request rather than at import, so the debug
+    # reloader's parent process never runs persisted jobs a second time
+    job_queue()
+    if Config.CACHE_ENABLED and Config.REFRESH_AHEAD_ENABLED:
+        refresh_ahead()
+
+
 @app.route('/fetch-and-summarize', methods=['POST'])
 def fetch_and_summarize():
     """
@@ -251,6 +875,16 @@ def fetch_and_summarize():
     Request body can include:
     - url: The URL to fetch and summarize (required)
     - force_refresh: If true, bypass cache and fetch fresh data (optional, default: false)
+    - fast: If true, return as soon as the short summary is ready; the full
+            summary is saved in the background (optional, default: false)
+    - async: If true, a cache miss is queued as a job and 202 is returned
+             with its job_id; poll GET /jobs/<job_id> (optional, default: false)
+    
+    An expired entry (see CACHE_STALE_WHILE_REVALIDATE) is returned at once
+    with "stale": true while a background job refreshes it.
+    
+    Concurrent misses for the same site are coalesced: one request fetches
+    and summarizes, the others wait for its result.
     """
     try:
         data = request.get_json()
@@ -259,74 +893,53 @@ def fetch_and_summarize():
 
         url = data['url']
         force_refresh = data.get('force_refresh', False)
+        fast = bool(data.get('fast', False))
         
         print(f"\n📥 Request for: {url}")
         if force_refresh:
             print(f"🔄 Force refresh requested - bypassing cache")
         
+        # Cache key is the host as requested; normalize_url ignores the scheme and
+        # "www.", so it matches the canonical host the fetcher saves under. The
+        # redirect check that finds that host only runs on a miss, in the fetch.
+        origin = request_origin(url)
+        site = urlparse(origin).netloc
+        requested_at = datetime.now().isoformat()
+        
+        job_payload = {
+            'url': url, 'origin': origin, 'site': site,
+            'fast': fast, 'requested_at': requested_at
+        }
+        
         # Check cache first if enabled and not forcing refresh
         if Config.CACHE_ENABLED and not force_refresh:
-            cached_summary = db.get_summary_by_url(url, expiry_days=Config.CACHE_EXPIRY_DAYS)
+            cached_summary = lookup_cached_summary(site)
             
-            if cached_summary:
+            if is_usable(cached_summary):
                 print(f"✨ CACHE HIT! Returning cached summary for: {url}")
                 print(f"💰 Tokens saved by using cache!")
-                
-                return jsonify({
-                    "id": cached_summary['id'],
-                    "short_summary": cached_summary['short_summary'],
-                    "url": cached_summary['url'],
-                    "policy_types": cached_summary.get('policy_types', []),
-                    "status": "success",
-                    "cached": True,
-                    "cached_at": cached_summary.get('created_at', 'N/A')
-                })
+                db.record_hit(cached_summary['id'])
+                if cached_summary.get('stale'):
+                    job = refresh_in_background(dict(job_payload, fast=False))
+                    return jsonify(cached_response(cached_summary, stale=True, refresh_job_id=job['id']))
+                return jsonify(cached_response(cached_summary))
             else:
                 print(f"🔍 Cache miss - will fetch and summarize")
         
-        # Not in cache or force refresh - proceed with fetching and summarizing
-        print(f"🌐 Fetching policies for: {url}")
-        
-        # Fetch policies
-        policy_data = fetch_policy_for_url(url)
-        
-        if not policy_data['found_types']:
+        # Job mode: hand the slow path to the job workers and answer now
+        if data.get('async', False):
+            job = job_queue().submit(job_payload, key=db.normalize_url(site))
+            print(f"📋 Queued job {job['id']} for: {site}")
             return jsonify({
-                "error": "No policies found",
-                "message": f"Could not find privacy policy, terms, or cookies policy for {url}"
-            }), 404
-        
-        # Combine all found policies
-        combined_text = ""
-        for policy_type in policy_data['found_types']:
-            combined_text += f"\n\n=== {policy_type.upper()} POLICY ===\n\n"
-            combined_text += policy_data['policies'][policy_type]
-        
-        print(f"✅ Found {len(policy_data['found_types'])} policies")
-        print(f"📝 Generating summaries...")
-        
-        # Generate both summaries
-        short_summary = generate_short_summary(combined_text)
-        full_summary = get_working_response(combined_text)
+                "job_id": job['id'],
+                "status": job['status'],
+                "status_url": f"/jobs/{job['id']}"
+            }), 202
         
-        # Store summaries (will update if URL already exists)
-        summary_id = db.save_summary(
-            url=policy_data['url'],
-            short_summary=short_summary,
-            full_summary=full_summary,
-            policy_types=policy_data['found_types']
-        )
-        
-        print(f"💾 Saved with ID: {summary_id}")
-        
-        return jsonify({
-            "id": summary_id,
-            "short_summary": short_summary,
-            "url": policy_data['url'],
-            "policy_types": policy_data['found_types'],
-            "status": "success",
-            "cached": False
-        })
+        body, status = run_fetch_and_summarize(job_payload)
+        if status == 200 and body.get('id'):
+            db.record_hit(body['id'])
+        return api_response(body, status)
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -334,6 +947,25 @@ def fetch_and_summarize():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status of an async fetch-and-summarize job
+    
+    status is queued | running | done | failed; when done, result holds the
+    body /fetch-and-summarize would have returned and status_code its code
+    """
+    try:
+        job = job_queue().get(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        job.pop('payload', None)
+        return jsonify(job)
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/summary/<summary_id>', methods=['GET'])
 def get_summary(summary_id):
     """
@@ -345,12 +977,13 @@ def get_summary(summary_id):
         if not summary:
             return jsonify({"error": "Summary not found"}), 404
         
-        # Parse the full_summary into structured sections
+        # Structured-mode summaries carry their sections; older ones are parsed
         full_text = summary.get('full_summary', '')
-        sections = parse_summary_into_sections(full_text)
+        sections = summary.get('sections') or parse_summary_into_sections(full_text)
         
         # Add structured sections to response
         summary['sections'] = sections
+        summary['pending'] = full_text == FULL_SUMMARY_PENDING
         
         return jsonify(summary)
 
@@ -414,6 +1047,249 @@ def parse_summary_into_sections(summary_text):
     
     return sections
 
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_full_summary(text_content):
+    """
+    Yield the full summary's text deltas as the model produces them
+
+    Falls back to the blocking get_working_response (with its own
+    fallbacks) if streaming fails before any text arrives.
+    """
+    received = False
+    try:
+        stream = llm.stream(
+            [
+                {"role": "system", "content": SYSTEM_INSTRUCTION},
+                {"role": "user", "content": text_content}
+            ],
+            temperature=0.3,
+            max_tokens=8192,
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                received = True
+                yield delta
+    except LLMError:
+        raise
+    except Exception as e:
+        if received:
+            raise
+        print(f"Streaming failed ({e}); generating without streaming...")
+        yield get_working_response(text_content)
+
+
+def completed_sections(summary_text, final=False):
+    """
+    Sections of a partial summary that can no longer change
+
+    A section is complete once the next section's header has appeared
+    (or the text is final). Keys and shape match parse_summary_into_sections.
+    """
+    sections = parse_summary_into_sections(summary_text)
+    started = sorted(
+        (summary_text.find(section['header']), key)
+        for key, section in sections.items() if section['header']
+    )
+    if not final:
+        started = started[:-1]
+    return {key: sections[key] for _, key in started}
+
+
+@app.route('/summarize-stream', methods=['GET'])
+def summarize_stream():
+    """
+    Stream the full summary for a site over Server-Sent Events
+    
+    Query parameters:
+    - url: The site to summarize (required)
+    - force_refresh: "true" to bypass the cache (optional)
+    
+    Events (JSON data):
+    - status:  {"stage": "fetching" | "summarizing"}
+    - token:   {"text": "..."} as the model writes
+    - section: {"key": "critical", "header": "...", "points": [...]} once a
+               section is complete (keys as in GET /summary/:id)
+    - done:    {"id", "short_summary", "url", "policy_types", "cached"}; a
+               stale replay adds "stale" and "refresh_job_id", and one that
+               waited on another request for the same site adds "coalesced"
+    - error:   {"error": "..."}; with "retry_after" (seconds) when the
+               LLM is rate limited or unavailable
+    """
+    url = request.args.get('url')
+    if not url:
+        return jsonify({"error": "No URL provided"}), 400
+    force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
+    
+    def summary_events(summary):
+        # A stored summary goes out as one token plus all its sections
+        full_text = summary.get('full_summary', '')
+        sections = summary.get('sections') or parse_summary_into_sections(full_text)
+        yield sse_event('token', {"text": full_text})
+        for key, section in sections.items():
+            if section['header']:
+                yield sse_event('section', {"key": key, **section})
+    
+    def replay(summary, **extra):
+        yield from summary_events(summary)
+        yield sse_event('done', cached_response(summary, **extra))
+    
+    def stream_miss(origin, emit):
+        """
+        The cache-miss path: fetch, then stream the summary through emit()
+        
+        Returns (response_body, status_code) like fetch_and_summarize_site,
+        so /fetch-and-summarize callers can share its result.
+        """
+        emit(sse_event('status', {"stage": "fetching"}))
+        policy_data = fetch_policy_for_url(origin)
+        if not policy_data['found_types']:
+            return {
+                "error": "No policies found",
+                "message": f"Could not find privacy policy, terms, or cookies policy for {url}"
+            }, 404
+        
+        combined_text = combine_policies(policy_data)
+        content_hash = db.generate_content_hash(combined_text)
+        if Config.CACHE_ENABLED:
+            previous = db.get_summary_by_url(policy_data['url'])
+            if previous and previous.get('content_hash') == content_hash:
+                db.touch_summary(previous['id'])
+                print(f"♻️  Policy text unchanged - replaying summaries for: {policy_data['url']}")
+                for event in summary_events(previous):
+                    emit(event)
+                return cached_response(previous, unchanged=True), 200
+        
+        emit(sse_event('status', {"stage": "summarizing"}))
+        started = time.time()
+        deadline = started + Config.SUMMARY_TIMEOUT
+        summary_input = condense_policy_text(combined_text, deadline=deadline)
+        short_future = summary_pool.submit(_timed, generate_short_summary, summary_input)
+        
+        full_summary = ""
+        emitted = set()
+        first_token_at = None
+        for delta in stream_full_summary(summary_input):
+            if first_token_at is None:
+                first_token_at = time.time()
+                print(f"⏱️  First token after {first_token_at - started:.1f}s")
+            full_summary += delta
+            emit(sse_event('token', {"text": delta}))
+            if "\n" in delta:
+                for key, section in completed_sections(full_summary).items():
+                    if key not in emitted:
+                        emitted.add(key)
+                        emit(sse_event('section', {"key": key, **section}))
+        for key, section in completed_sections(full_summary, final=True).items():
+            if key not in emitted:
+                emit(sse_event('section', {"key": key, **section}))
+        print(f"⏱️  Full summary streamed in {time.time() - started:.1f}s")
+        
+        short_summary = wait_for_summary(short_future, deadline, "Short")
+        summary_id = db.save_summary(
+            url=policy_data['url'],
+            short_summary=short_summary,
+            full_summary=full_summary,
+            policy_types=policy_data['found_types'],
+            content_hash=content_hash
+        )
+        print(f"💾 Saved with ID: {summary_id}")
+        
+        return {
+            "id": summary_id,
+            "short_summary": short_summary,
+            "url": policy_data['url'],
+            "policy_types": policy_data['found_types'],
+            "status": "success",
+            "cached": False
+        }, 200
+    
+    def generate():
+        try:
+            print(f"\n📡 Stream request for: {url}")
+            origin = request_origin(url)
+            site = urlparse(origin).netloc
+            requested_at = datetime.now().isoformat()
+            
+            if Config.CACHE_ENABLED and not force_refresh:
+                cached_summary = lookup_cached_summary(site)
+                if is_usable(cached_summary):
+                    print(f"✨ CACHE HIT! Replaying cached summary for: {url}")
+                    db.record_hit(cached_summary['id'])
+                    if cached_summary.get('stale'):
+                        job = refresh_in_background({
+                            'url': url, 'origin': origin, 'site': site, 'fast': False,
+                            'requested_at': requested_at
+                        })
+                        yield from replay(cached_summary, stale=True, refresh_job_id=job['id'])
+                    else:
+                        yield from replay(cached_summary)
+                    return
+            
+            failure = recent_failure(site)
+            if failure:
+                yield sse_event('error', failure)
+                return
+            
+            # Coalesced with other misses for the site (streamed or not): the
+            # leader streams as it goes, the others replay what it saved.
+            # single_flight blocks, so it runs on a thread feeding `events`.
+            events = queue.Queue()
+            finished = object()
+            outcome = {}
+            
+            def miss():
+                outcome['streamed'] = True
+                return stream_miss(origin, events.put)
+            
+            def lead_or_wait():
+                try:
+                    outcome['result'] = single_flight.do(
+                        db.normalize_url(site), miss,
+                        timeout=Config.SINGLE_FLIGHT_WAIT,
+                        recheck=lambda: saved_since(site, requested_at)
+                    )
+                except BaseException as e:
+                    outcome['error'] = e
+                finally:
+                    events.put(finished)
+            
+            threading.Thread(target=lead_or_wait, name="summarize-stream", daemon=True).start()
+            yield from iter(events.get, finished)
+            if 'error' in outcome:
+                raise outcome['error']
+            
+            (body, status), shared = outcome['result']
+            if status != 200:
+                yield sse_event('error', body)
+                return
+            if not outcome.get('streamed'):
+                print(f"🤝 Coalesced with an in-flight request for: {site}")
+                summary = db.get_summary_by_id(body['id'])
+                if summary:
+                    yield from summary_events(summary)
+                body = dict(body, coalesced=True)
+            db.record_hit(body['id'])
+            yield sse_event('done', body)
+        except LLMError as e:
+            yield sse_event('error', remember_failure(site, e))
+        except Exception as e:
+            print(f"❌ Stream error: {e}")
+            yield sse_event('error', {"error": str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/recent', methods=['GET'])
 def get_recent():
     """Get recent summaries"""
@@ -443,13 +1319,41 @@ def cache_stats():
             stats = db.get_cache_stats()
             stats['cache_enabled'] = Config.CACHE_ENABLED
             stats['cache_expiry_days'] = Config.CACHE_EXPIRY_DAYS
+            stats['cache_hard_expiry_days'] = (
+                Config.CACHE_HARD_EXPIRY_DAYS if Config.CACHE_STALE_WHILE_REVALIDATE else None
+            )
             stats['db_type'] = Config.DB_TYPE
+            stats['llm_cache'] = llm_cache.stats() if llm_cache else None
+            stats['refresh_ahead'] = (
+                refresh_ahead().stats() if Config.CACHE_ENABLED and Config.REFRESH_AHEAD_ENABLED else None
+            )
             return jsonify(stats)
         else:
             return jsonify({"error": "Cache stats not available for this database type"}), 501
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/cache/popular', methods=['GET'])
+def cache_popular():
+    """Most requested sites, as the refresh-ahead scheduler sees them"""
+    try:
+        limit = request.args.get('limit', Config.REFRESH_AHEAD_TOP_N, type=int)
+        return jsonify({
+            "popular": [
+                {
+                    "id": s['id'],
+                    "url": s['url'],
+                    "hit_count": s.get('hit_count', 0),
+                    "last_hit": s.get('last_hit'),
+                    "timestamp": s.get('timestamp')
+                }
+                for s in db.get_popular(limit)
+            ]
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/cache/clear', methods=['POST'])
 def cache_clear():
     """
@@ -468,8 +1372,10 @@ def cache_clear():
         url = data['url']
         print(f"🗑️  Clearing cache for: {url}")
         
-        # Delete the cached summary
-        success = db.delete_summary_by_url(url)
+        # Delete the cached summary (stored under the canonical host, which
+        # normalize_url matches without the scheme and "www.")
+        site = urlparse(request_origin(url)).netloc
+        success = db.delete_summary_by_url(site) or db.delete_summary_by_url(url)
         
         if success:
             print(f"✅ Cache cleared for: {url}")
@@ -491,6 +1397,28 @@ def cache_clear():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/fetcher/stats', methods=['GET'])
+def fetcher_stats():
+    """Policy fetcher tier counters and browser pool health"""
+    try:
+        return jsonify(get_fetcher_stats())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/llm/stats', methods=['GET'])
+def llm_stats():
+    """Per-endpoint latency, hedging and errors, plus budget usage"""
+    try:
+        return jsonify({
+            "endpoints": llm.stats(),
+            "rate_limits": rate_limiter_stats(),
+            "recent_failures": len(recent_failures)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/demo-summary', methods=['POST'])
 def demo_summary():
     """
@@ -573,10 +1501,15 @@ if __name__ == '__main__':
     print("Endpoints:")
     print("  POST /fetch-and-summarize - Fetch and analyze policy")
     print("  POST /demo-summary        - Create demo summary (no API key needed)")
+    print("  GET  /jobs/<id>           - Async job status and result")
     print("  GET  /summary/<id>        - Get full summary")
+    print("  GET  /summarize-stream    - Stream full summary (SSE)")
     print("  POST /summarize           - Analyze uploaded text")
     print("  GET  /recent              - Get recent summaries")
     print("  GET  /health              - Health check")
     print("  GET  /cache/stats         - Cache statistics")
+    print("  GET  /cache/popular       - Most requested sites")
     print("  POST /cache/clear         - Clear cache for specific URL")
+    print("  GET  /fetcher/stats       - Fetcher tier counters")
+    print("  GET  /llm/stats           - LLM rate limit counters")
     app.run(debug=True, port=5000)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HTML-to-Text Extractor Benchmark
+Compares the TEXT_EXTRACTOR backends on a corpus of saved policy pages
+
+Usage:
+    python bench_extractors.py <corpus_dir> [--repeat 3]
+    python bench_extractors.py --save-corpus <corpus_dir> github.com stripe.com ...
+
+The corpus is a directory of *.html files (e.g. policy pages saved from a
+browser, or collected with --save-corpus). Each backend runs in a fresh
+subprocess so peak memory figures don't leak between backends:
+- peak_traced_mb: Python-heap peak (tracemalloc) while extracting
+- max_rss_mb: process high-water mark, includes C parser allocations
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from services.text_extract import BACKENDS, extract_bs4, get_extractor
+
+
+def load_corpus(corpus_dir: str) -> list:
+    pages = []
+    for path in sorted(Path(corpus_dir).glob("*.htm*")):
+        pages.append(path.read_text(encoding="utf-8", errors="replace"))
+    return pages
+
+
+def _run_backend(name: str, corpus_dir: str, repeat: int, conn):
+    """Child process: extract the whole corpus `repeat` times"""
+    extract = get_extractor(name)
+    pages = load_corpus(corpus_dir)
+    total_bytes = sum(len(p.encode("utf-8")) for p in pages) * repeat
+
+    extract(pages[0])  # warm up imports
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract(page)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    conn.send({
+        'pages_per_sec': len(pages) * repeat / elapsed,
+        'mb_per_sec': total_bytes / (1024 * 1024) / elapsed,
+        'peak_traced_mb': peak / (1024 * 1024),
+        'max_rss_mb': rss_mb,
+    })
+    conn.close()
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of word sets; 1.0 means the same vocabulary"""
+    wa, wb = set(a.split()), set(b.split())
+    if not wa and not wb:
+        return 1.0
+    return len(wa & wb) / len(wa | wb)
+
+
+def benchmark(corpus_dir: str, repeat: int):
+    pages = load_corpus(corpus_dir)
+    if not pages:
+        print(f"No *.html files in {corpus_dir}. Collect some with --save-corpus.")
+        sys.exit(1)
+    size_mb = sum(len(p.encode("utf-8")) for p in pages) / (1024 * 1024)
+    print(f"\nCorpus: {len(pages)} pages, {size_mb:.1f} MB, repeat={repeat}\n")
+
+    reference = [extract_bs4(p) for p in pages]
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{'backend':<12}{'pages/s':>10}{'MB/s':>10}{'traced MB':>12}{'RSS MB':>10}{'match':>8}")
+    for name in BACKENDS:
+        extract = get_extractor(name)
+        if name != "bs4" and extract is extract_bs4:
+            print(f"{name:<12}  (not installed)")
+            continue
+
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_run_backend, args=(name, corpus_dir, repeat, child))
+        proc.start()
+        result = parent.recv()
+        proc.join()
+
+        match = sum(similarity(r, extract(p)) for r, p in zip(reference, pages)) / len(pages)
+        print(f"{name:<12}{result['pages_per_sec']:>10.1f}{result['mb_per_sec']:>10.2f}"
+              f"{result['peak_traced_mb']:>12.1f}{result['max_rss_mb']:>10.1f}{match:>8.3f}")
+
+
+def save_corpus(corpus_dir: str, sites: list):
+    """Fetch each site's policy pages (raw HTML) into the corpus directory"""
+    import policy_fetcher_safe as fetcher
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    cache = fetcher.site_cache()
+    for site in sites:
+        fetcher.fetch_policy_for_url(site)
+        origin = fetcher.canonical_origin(site)  # remembered by the lookup above
+        if cache:
+            urls = cache.get_working(origin)
+        else:
+            # No record of which pages worked: take the links the homepage advertises
+            urls = {t: links[0] for t, links in fetcher.discover_policy_links(origin).items()}
+        for policy_type, url in urls.items():
+            outcome = fetcher.fetch_static(url, keep_html=True)
+            if outcome.html:
+                name = f"{fetcher.safe_domain(url)}_{policy_type}.html"
+                Path(corpus_dir, name).write_text(outcome.html, encoding="utf-8")
+                print(f"[saved] {name} ({len(outcome.html)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", nargs="?")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save-corpus", metavar="DIR")
+    parser.add_argument("sites", nargs="*")
+    args = parser.parse_args()
+
+    if args.save_corpus:
+        save_corpus(args.save_corpus, ([args.corpus_dir] if args.corpus_dir else []) + args.sites)
+    elif args.corpus_dir:
+        benchmark(args.corpus_dir, args.repeat)
+    else:
+        parser.print_help()
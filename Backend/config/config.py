@@ -47,6 +47,55 @@ class Config:
     # Cache Settings
     CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "true").lower() == "true"
     CACHE_EXPIRY_DAYS = int(os.environ.get("CACHE_EXPIRY_DAYS", 30))  # Cache validity period
+    CACHE_STALE_WHILE_REVALIDATE = os.environ.get("CACHE_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+    CACHE_HARD_EXPIRY_DAYS = int(os.environ.get("CACHE_HARD_EXPIRY_DAYS", 90))  # Stale entries past this are refreshed synchronously
+    
+    # Refresh-Ahead (popular entries are re-summarized before they expire)
+    REFRESH_AHEAD_ENABLED = os.environ.get("REFRESH_AHEAD_ENABLED", "true").lower() == "true"
+    REFRESH_AHEAD_TOP_N = int(os.environ.get("REFRESH_AHEAD_TOP_N", 50))  # Most-hit entries kept fresh
+    REFRESH_AHEAD_LEAD_DAYS = float(os.environ.get("REFRESH_AHEAD_LEAD_DAYS", 2))  # Refresh this long before expiry
+    REFRESH_AHEAD_TOKENS_PER_HOUR = int(os.environ.get("REFRESH_AHEAD_TOKENS_PER_HOUR", 100000))  # LLM budget for refreshes
+    REFRESH_AHEAD_TOKENS_PER_REFRESH = int(os.environ.get("REFRESH_AHEAD_TOKENS_PER_REFRESH", 20000))  # Estimate reserved while a refresh runs
+    REFRESH_AHEAD_INTERVAL = int(os.environ.get("REFRESH_AHEAD_INTERVAL", 600))  # Seconds between scheduler runs
+    
+    # Summary Generation
+    SUMMARY_TIMEOUT = int(os.environ.get("SUMMARY_TIMEOUT", 120))  # Seconds, shared by the short and full calls
+    SUMMARY_WORKERS = int(os.environ.get("SUMMARY_WORKERS", 8))  # Concurrent LLM calls across requests
+    SUMMARY_MODE = os.environ.get("SUMMARY_MODE", "split").lower()  # 'split' (two calls) or 'structured' (one JSON call)
+    SUMMARY_INPUT_TOKENS = int(os.environ.get("SUMMARY_INPUT_TOKENS", 12000))  # Longer policies are map-reduced
+    SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", 4000))  # Chunk size for the map step
+    SUMMARY_MAP_WORKERS = int(os.environ.get("SUMMARY_MAP_WORKERS", 4))  # Chunks summarized at once
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_FILE = os.environ.get(
+        "LLM_CACHE_FILE", os.path.join(os.path.dirname(os.path.dirname(__file__)), "llm_cache.json")
+    )
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 2000))  # Least recently used replies are evicted
+    
+    # LLM Endpoints
+    LLM_ENDPOINTS = os.environ.get("LLM_ENDPOINTS", "")  # JSON list of OpenAI-compatible endpoints; unset = Perplexity only
+    LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))  # Per-request timeout, unless an endpoint sets its own
+    LLM_HEDGE = os.environ.get("LLM_HEDGE", "true").lower() == "true"  # Duplicate requests slower than the endpoint's p95
+    LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", 20))  # Latencies needed before hedging starts
+    
+    # LLM Rate Limiting (per endpoint)
+    LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", 50))  # Perplexity sonar default tier
+    LLM_TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", 0))  # 0 = no token budget
+    LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 3))  # Retries for 429s, 5xx and timeouts
+    LLM_MAX_WAIT = float(os.environ.get("LLM_MAX_WAIT", 30))  # Seconds a call may wait for budget before failing
+    LLM_FAILURE_TTL = int(os.environ.get("LLM_FAILURE_TTL", 60))  # Seconds a failed site answers 503 without retrying
+    
+    # Request Coalescing
+    SINGLE_FLIGHT_LOCK_DIR = os.environ.get("SINGLE_FLIGHT_LOCK_DIR", "")  # Set to coalesce across worker processes
+    SINGLE_FLIGHT_WAIT = int(os.environ.get("SINGLE_FLIGHT_WAIT", 300))  # Seconds a duplicate request waits before doing the work itself
+    
+    # Async Jobs
+    JOB_QUEUE_FILE = os.environ.get(
+        "JOB_QUEUE_FILE", os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.json")
+    )
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))  # Background fetch-and-summarize workers
+    JOB_RETENTION_HOURS = float(os.environ.get("JOB_RETENTION_HOURS", 24))  # How long finished jobs can be polled
 
 
 class DevelopmentConfig(Config):
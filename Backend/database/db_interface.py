@@ -6,6 +6,7 @@ Provides abstraction for different database backends (JSON, DynamoDB, etc.)
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, List
 import hashlib
+import re
 from datetime import datetime, timedelta
 
 
@@ -13,16 +14,36 @@ class DatabaseInterface(ABC):
     """Abstract base class for database operations"""
     
     @abstractmethod
-    def get_summary_by_url(self, url: str) -> Optional[Dict]:
-        """Retrieve cached summary by URL"""
+    def get_summary_by_url(self, url: str, expiry_days: int = None,
+                           hard_expiry_days: int = None) -> Optional[Dict]:
+        """
+        Retrieve cached summary by URL
+        Past expiry_days it is returned marked 'stale' until hard_expiry_days
+        """
         pass
     
     @abstractmethod
     def save_summary(self, url: str, short_summary: str, full_summary: str, 
-                    policy_types: List[str] = None) -> str:
+                    policy_types: List[str] = None, content_hash: str = None,
+                    sections: Dict = None) -> str:
         """Save summary and return unique ID"""
         pass
     
+    @abstractmethod
+    def touch_summary(self, summary_id: str) -> bool:
+        """Mark a summary as fresh (bump its timestamp) without changing it"""
+        pass
+    
+    @abstractmethod
+    def record_hit(self, summary_id: str):
+        """Count one request served by this summary (popularity for refresh-ahead)"""
+        pass
+    
+    @abstractmethod
+    def get_popular(self, limit: int = 50) -> List[Dict]:
+        """Most requested summaries, with 'hit_count' and 'last_hit', most hits first"""
+        pass
+    
     @abstractmethod
     def get_summary_by_id(self, summary_id: str) -> Optional[Dict]:
         """Retrieve summary by unique ID"""
@@ -61,6 +82,15 @@ class DatabaseInterface(ABC):
         normalized_url = self.normalize_url(url)
         return hashlib.sha256(normalized_url.encode()).hexdigest()[:16]
     
+    def generate_content_hash(self, text: str) -> str:
+        """
+        Hash policy text for change detection
+        Whitespace runs are collapsed first, so re-wrapped or re-indented
+        HTML that extracts to the same words hashes the same
+        """
+        normalized = re.sub(r'\s+', ' ', text or '').strip()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
     def is_cache_expired(self, timestamp_str: str, expiry_days: int) -> bool:
         """
         Check if cached data has expired
@@ -80,6 +110,24 @@ class DatabaseInterface(ABC):
             # If timestamp is invalid, consider it expired
             return True
     
+    def check_expiry(self, summary: Dict, url: str, expiry_days: int = None,
+                     hard_expiry_days: int = None) -> Optional[Dict]:
+        """
+        Apply the cache expiry rules to a looked-up summary
+        
+        Returns the summary if fresh, a copy marked stale=True if it is past
+        expiry_days but not hard_expiry_days (stale-while-revalidate), else None
+        """
+        if expiry_days is None or 'timestamp' not in summary:
+            return summary
+        if not self.is_cache_expired(summary['timestamp'], expiry_days):
+            return summary
+        if hard_expiry_days is not None and not self.is_cache_expired(summary['timestamp'], hard_expiry_days):
+            print(f"🕰️  Serving stale cache for URL: {url}")
+            return dict(summary, stale=True)
+        print(f"⏰ Cache expired for URL: {url}")
+        return None
+    
     def delete_summary_by_url(self, url: str) -> bool:
         """
         Delete a summary by URL (for cache clearing)
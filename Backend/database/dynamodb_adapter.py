@@ -5,6 +5,7 @@ Cloud-based storage with URL caching
 
 import uuid
 import boto3
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime
 from typing import Optional, Dict, List
 from .db_interface import DatabaseInterface
@@ -28,6 +29,10 @@ class DynamoDBAdapter(DatabaseInterface):
     - short_summary: 50-word summary
     - full_summary: 1000-word summary
     - policy_types: List of policy types
+    - content_hash: Hash of the policy text the summaries were made from
+    - sections: Structured full summary {critical|concerning|good|standard: {header, points}}
+    - hit_count: Requests served by this summary (atomic ADD, kept across updates)
+    - last_hit: ISO timestamp of the latest of those requests
     - timestamp: ISO timestamp
     - created_at: Human-readable creation time
     - updated_at: Last update time
@@ -55,7 +60,8 @@ class DynamoDBAdapter(DatabaseInterface):
         self.dynamodb = boto3.resource('dynamodb', **session_params)
         self.table = self.dynamodb.Table(table_name)
     
-    def get_summary_by_url(self, url: str, expiry_days: int = None) -> Optional[Dict]:
+    def get_summary_by_url(self, url: str, expiry_days: int = None,
+                           hard_expiry_days: int = None) -> Optional[Dict]:
         """
         Retrieve cached summary by URL using GSI
         Returns None if not found or if cache has expired
@@ -63,6 +69,7 @@ class DynamoDBAdapter(DatabaseInterface):
         Args:
             url: URL to look up
             expiry_days: Number of days before cache expires (None = never expire)
+            hard_expiry_days: Serve expired entries marked stale=True until this age
         """
         try:
             url_hash = self.generate_url_hash(url)
@@ -82,12 +89,7 @@ class DynamoDBAdapter(DatabaseInterface):
                 deserialized_item = self._deserialize_item(item)
                 
                 # Check if cache has expired
-                if expiry_days is not None and 'timestamp' in deserialized_item:
-                    if self.is_cache_expired(deserialized_item['timestamp'], expiry_days):
-                        print(f"⏰ Cache expired for URL: {url}")
-                        return None
-                
-                return deserialized_item
+                return self.check_expiry(deserialized_item, url, expiry_days, hard_expiry_days)
             
             return None
             
@@ -96,7 +98,8 @@ class DynamoDBAdapter(DatabaseInterface):
             return None
     
     def save_summary(self, url: str, short_summary: str, full_summary: str,
-                    policy_types: List[str] = None) -> str:
+                    policy_types: List[str] = None, content_hash: str = None,
+                    sections: Dict = None) -> str:
         """
         Save summary to DynamoDB
         If URL already exists, update the existing entry
@@ -116,23 +119,45 @@ class DynamoDBAdapter(DatabaseInterface):
                 summary_id = str(uuid.uuid4())
                 print(f"✨ Creating new summary in DynamoDB for URL: {url}")
             
-            # Prepare item
-            item = {
-                'summary_id': summary_id,
+            # Prepare attributes
+            now = datetime.now()
+            attributes = {
                 'url': url,
                 'normalized_url': self.normalize_url(url),
                 'url_hash': url_hash,
                 'short_summary': short_summary,
                 'full_summary': full_summary,
                 'policy_types': policy_types or [],
-                'timestamp': datetime.now().isoformat(),
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now.isoformat(),
+                'updated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
                 'id': summary_id  # For compatibility with frontend
             }
+            removed = []
+            for name, value in (('content_hash', content_hash), ('sections', sections)):
+                if value:
+                    attributes[name] = value
+                else:
+                    removed.append(name)
+            
+            # SET only the summary's own attributes so a concurrent record_hit's
+            # ADD on hit_count/last_hit is never overwritten by a stale copy
+            names = {f'#a{i}': name for i, name in enumerate(attributes)}
+            values = {f':a{i}': value for i, value in enumerate(attributes.values())}
+            expression = 'SET ' + ', '.join(f'#a{i} = :a{i}' for i in range(len(attributes)))
+            names['#created'] = 'created_at'
+            values[':created'] = now.strftime('%Y-%m-%d %H:%M:%S')
+            expression += ', #created = if_not_exists(#created, :created)'
+            if removed:
+                names.update({f'#r{i}': name for i, name in enumerate(removed)})
+                expression += ' REMOVE ' + ', '.join(f'#r{i}' for i in range(len(removed)))
             
             # Save to DynamoDB
-            self.table.put_item(Item=item)
+            self.table.update_item(
+                Key={'summary_id': summary_id},
+                UpdateExpression=expression,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
             
             return summary_id
             
@@ -140,6 +165,62 @@ class DynamoDBAdapter(DatabaseInterface):
             print(f"Error saving to DynamoDB: {e}")
             raise
     
+    def touch_summary(self, summary_id: str) -> bool:
+        """Bump timestamp/updated_at so the entry counts as fresh again"""
+        try:
+            self.table.update_item(
+                Key={'summary_id': summary_id},
+                UpdateExpression='SET #ts = :ts, updated_at = :updated_at',
+                ConditionExpression='attribute_exists(summary_id)',
+                ExpressionAttributeNames={'#ts': 'timestamp'},  # reserved word
+                ExpressionAttributeValues={
+                    ':ts': datetime.now().isoformat(),
+                    ':updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }
+            )
+            return True
+        except Exception as e:
+            print(f"Error touching summary in DynamoDB: {e}")
+            return False
+    
+    def record_hit(self, summary_id: str):
+        """Atomically count one hit on the summary's item"""
+        try:
+            self.table.update_item(
+                Key={'summary_id': summary_id},
+                UpdateExpression='ADD hit_count :one SET last_hit = :now',
+                ConditionExpression='attribute_exists(summary_id)',
+                ExpressionAttributeValues={
+                    ':one': 1,
+                    ':now': datetime.now().isoformat()
+                }
+            )
+        except Exception as e:
+            print(f"Error recording hit in DynamoDB: {e}")
+    
+    def get_popular(self, limit: int = 50) -> List[Dict]:
+        """
+        Most requested summaries
+        Scans items with hits (not efficient for large datasets; the
+        refresh-ahead scheduler only calls this every few minutes)
+        """
+        try:
+            items = []
+            scan_params = {'FilterExpression': Attr('hit_count').gt(0)}
+            while True:
+                response = self.table.scan(**scan_params)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+            items.sort(key=lambda x: x.get('hit_count', 0), reverse=True)
+            return [self._deserialize_item(item) for item in items[:limit]]
+            
+        except Exception as e:
+            print(f"Error scanning DynamoDB for popular summaries: {e}")
+            return []
+    
     def get_summary_by_id(self, summary_id: str) -> Optional[Dict]:
         """Retrieve summary by unique ID"""
         try:
@@ -4,6 +4,10 @@ File-based storage (current implementation)
 """
 
 import json
+import os
+import tempfile
+import threading
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -12,14 +16,37 @@ from .db_interface import DatabaseInterface
 
 
 class JSONDatabase(DatabaseInterface):
-    """JSON file-based database (backward compatible with summaries_db.json)"""
+    """
+    JSON file-based database (backward compatible with summaries_db.json)
+    
+    Hit counts live in url_index ('hits', 'last_hit'). They are buffered in
+    memory and written with the next save, or every HIT_FLUSH_SECONDS,
+    so a cache hit doesn't rewrite the whole file.
+    
+    Request threads, job workers and the refresh-ahead thread share one
+    instance, so reading or changing `data` and saving it happen under `_lock`.
+    """
+    
+    HIT_FLUSH_SECONDS = 30
     
     def __init__(self, storage_file='summaries_db.json'):
         self.storage_file = Path(storage_file)
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._hits_lock = threading.Lock()
+        self._pending_hits = {}  # url_hash -> (count, last_hit)
+        self._hits_flushed_at = time.time()
         self.data = self._load()
     
+    def _file_mtime(self):
+        try:
+            return self.storage_file.stat().st_mtime_ns
+        except OSError:
+            return None
+    
     def _load(self) -> Dict:
         """Load data from JSON file"""
+        self._mtime = self._file_mtime()
         if self.storage_file.exists():
             try:
                 with open(self.storage_file, 'r', encoding='utf-8') as f:
@@ -28,12 +55,39 @@ class JSONDatabase(DatabaseInterface):
                 return {'summaries': {}, 'url_index': {}}
         return {'summaries': {}, 'url_index': {}}
     
+    def _refresh(self):
+        """
+        Reload if another process (a second worker) rewrote the file
+        Called before reads and writes so processes see each other's summaries
+        """
+        with self._lock:
+            if self._file_mtime() != self._mtime:
+                self.data = self._load()
+    
+    def _apply_hits(self):
+        """Move buffered hit counts into url_index (callers save afterwards)"""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._hits_flushed_at = time.time()
+        for url_hash, (count, last_hit) in pending.items():
+            entry = self.data.get('url_index', {}).get(url_hash)
+            if entry:
+                entry['hits'] = entry.get('hits', 0) + count
+                entry['last_hit'] = last_hit
+    
     def _save(self):
-        """Save data to JSON file"""
-        with open(self.storage_file, 'w', encoding='utf-8') as f:
+        """Save data to JSON file (atomically, so other processes never read half a file)"""
+        self._apply_hits()
+        # A temp file per write: another process may be saving at the same time
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.storage_file.parent,
+                                         prefix=self.storage_file.name, suffix='.tmp',
+                                         delete=False) as f:
             json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(f.name, self.storage_file)
+        self._mtime = self._file_mtime()
     
-    def get_summary_by_url(self, url: str, expiry_days: int = None) -> Optional[Dict]:
+    def get_summary_by_url(self, url: str, expiry_days: int = None,
+                           hard_expiry_days: int = None) -> Optional[Dict]:
         """
         Retrieve cached summary by URL
         Returns None if not found or if cache has expired
@@ -41,127 +95,194 @@ class JSONDatabase(DatabaseInterface):
         Args:
             url: URL to look up
             expiry_days: Number of days before cache expires (None = never expire)
+            hard_expiry_days: Serve expired entries marked stale=True until this age
         """
-        url_hash = self.generate_url_hash(url)
-        
-        # Check if URL is in index
-        if url_hash not in self.data.get('url_index', {}):
-            return None
-        
-        summary_id = self.data['url_index'][url_hash]['summary_id']
-        summary = self.data['summaries'].get(summary_id)
-        
-        if not summary:
-            return None
-        
-        # Check if cache has expired
-        if expiry_days is not None and 'timestamp' in summary:
-            if self.is_cache_expired(summary['timestamp'], expiry_days):
-                print(f"⏰ Cache expired for URL: {url}")
+        with self._lock:
+            self._refresh()
+            url_hash = self.generate_url_hash(url)
+            
+            # Check if URL is in index
+            if url_hash not in self.data.get('url_index', {}):
                 return None
-        
-        return summary
+            
+            summary_id = self.data['url_index'][url_hash]['summary_id']
+            summary = self.data['summaries'].get(summary_id)
+            
+            if not summary:
+                return None
+            
+            # Check if cache has expired
+            return self.check_expiry(summary, url, expiry_days, hard_expiry_days)
     
     def save_summary(self, url: str, short_summary: str, full_summary: str, 
-                    policy_types: List[str] = None) -> str:
+                    policy_types: List[str] = None, content_hash: str = None,
+                    sections: Dict = None) -> str:
         """
         Save summary with URL indexing for caching
         If URL already exists, update the existing entry
+        content_hash identifies the policy text the summaries were made from
+        sections is the structured form of full_summary, when the model produced one
         """
-        url_hash = self.generate_url_hash(url)
-        
-        # Check if URL already exists
-        if url_hash in self.data.get('url_index', {}):
-            # Update existing entry
-            summary_id = self.data['url_index'][url_hash]['summary_id']
-            print(f"🔄 Updating existing summary for URL: {url}")
-        else:
-            # Create new entry
-            summary_id = str(uuid.uuid4())
-            print(f"✨ Creating new summary for URL: {url}")
-        
-        # Ensure data structure exists
-        if 'summaries' not in self.data:
-            self.data['summaries'] = {}
-        if 'url_index' not in self.data:
-            self.data['url_index'] = {}
-        
-        # Save summary data
-        self.data['summaries'][summary_id] = {
-            'id': summary_id,
-            'url': url,
-            'normalized_url': self.normalize_url(url),
-            'short_summary': short_summary,
-            'full_summary': full_summary,
-            'policy_types': policy_types or [],
-            'timestamp': datetime.now().isoformat(),
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Update URL index for fast lookups
-        self.data['url_index'][url_hash] = {
-            'url': url,
-            'normalized_url': self.normalize_url(url),
-            'summary_id': summary_id,
-            'last_accessed': datetime.now().isoformat()
-        }
-        
-        self._save()
-        return summary_id
+        with self._lock:
+            self._refresh()
+            url_hash = self.generate_url_hash(url)
+            
+            # Check if URL already exists
+            if url_hash in self.data.get('url_index', {}):
+                # Update existing entry
+                summary_id = self.data['url_index'][url_hash]['summary_id']
+                print(f"🔄 Updating existing summary for URL: {url}")
+            else:
+                # Create new entry
+                summary_id = str(uuid.uuid4())
+                print(f"✨ Creating new summary for URL: {url}")
+            
+            # Ensure data structure exists
+            if 'summaries' not in self.data:
+                self.data['summaries'] = {}
+            if 'url_index' not in self.data:
+                self.data['url_index'] = {}
+            
+            # Save summary data
+            self.data['summaries'][summary_id] = {
+                'id': summary_id,
+                'url': url,
+                'normalized_url': self.normalize_url(url),
+                'short_summary': short_summary,
+                'full_summary': full_summary,
+                'policy_types': policy_types or [],
+                'content_hash': content_hash,
+                'sections': sections,
+                'timestamp': datetime.now().isoformat(),
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            
+            # Update URL index for fast lookups (hit counts carry over)
+            previous = self.data['url_index'].get(url_hash, {})
+            self.data['url_index'][url_hash] = {
+                'url': url,
+                'normalized_url': self.normalize_url(url),
+                'summary_id': summary_id,
+                'last_accessed': datetime.now().isoformat(),
+                'hits': previous.get('hits', 0),
+                'last_hit': previous.get('last_hit')
+            }
+            
+            self._save()
+            return summary_id
+    
+    def touch_summary(self, summary_id: str) -> bool:
+        """Bump timestamp/updated_at so the entry counts as fresh again"""
+        with self._lock:
+            self._refresh()
+            summary = self.data.get('summaries', {}).get(summary_id)
+            if not summary:
+                return False
+            
+            summary['timestamp'] = datetime.now().isoformat()
+            summary['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            url_hash = self.generate_url_hash(summary['url'])
+            if url_hash in self.data.get('url_index', {}):
+                self.data['url_index'][url_hash]['last_accessed'] = datetime.now().isoformat()
+            
+            self._save()
+            return True
+    
+    def record_hit(self, summary_id: str):
+        """Buffer one hit for the summary's URL; flushed with the next save"""
+        with self._lock:
+            self._refresh()
+            summary = self.data.get('summaries', {}).get(summary_id)
+            if not summary:
+                return
+            url_hash = self.generate_url_hash(summary['url'])
+        with self._hits_lock:
+            count, _ = self._pending_hits.get(url_hash, (0, None))
+            self._pending_hits[url_hash] = (count + 1, datetime.now().isoformat())
+            due = time.time() - self._hits_flushed_at >= self.HIT_FLUSH_SECONDS
+        if due:
+            with self._lock:
+                self._refresh()
+                self._save()
+    
+    def get_popular(self, limit: int = 50) -> List[Dict]:
+        """Most requested summaries (buffered hits included)"""
+        with self._lock:
+            self._refresh()
+            with self._hits_lock:
+                pending = dict(self._pending_hits)
+            popular = []
+            for url_hash, entry in self.data.get('url_index', {}).items():
+                summary = self.data['summaries'].get(entry['summary_id'])
+                count, last_hit = pending.get(url_hash, (0, None))
+                hits = entry.get('hits', 0) + count
+                if summary and hits:
+                    popular.append(dict(summary, hit_count=hits, last_hit=last_hit or entry.get('last_hit')))
+            popular.sort(key=lambda s: s['hit_count'], reverse=True)
+            return popular[:limit]
     
     def get_summary_by_id(self, summary_id: str) -> Optional[Dict]:
         """Retrieve summary by unique ID"""
-        return self.data['summaries'].get(summary_id)
+        with self._lock:
+            self._refresh()
+            return self.data['summaries'].get(summary_id)
     
     def get_recent(self, limit: int = 10) -> List[Dict]:
         """Get most recent summaries"""
-        sorted_summaries = sorted(
-            self.data['summaries'].values(),
-            key=lambda x: x.get('timestamp', ''),
-            reverse=True
-        )
-        return sorted_summaries[:limit]
+        with self._lock:
+            self._refresh()
+            sorted_summaries = sorted(
+                self.data['summaries'].values(),
+                key=lambda x: x.get('timestamp', ''),
+                reverse=True
+            )
+            return sorted_summaries[:limit]
     
     def delete_summary(self, summary_id: str) -> bool:
         """Delete a summary and its URL index"""
-        if summary_id in self.data['summaries']:
-            # Find and remove from URL index
-            summary = self.data['summaries'][summary_id]
-            url_hash = self.generate_url_hash(summary['url'])
-            if url_hash in self.data.get('url_index', {}):
-                del self.data['url_index'][url_hash]
-            
-            # Remove summary
-            del self.data['summaries'][summary_id]
-            self._save()
-            return True
-        return False
+        with self._lock:
+            self._refresh()
+            if summary_id in self.data['summaries']:
+                # Find and remove from URL index
+                summary = self.data['summaries'][summary_id]
+                url_hash = self.generate_url_hash(summary['url'])
+                if url_hash in self.data.get('url_index', {}):
+                    del self.data['url_index'][url_hash]
+                
+                # Remove summary
+                del self.data['summaries'][summary_id]
+                self._save()
+                return True
+            return False
     
     def clear_old(self, days: int = 30) -> int:
         """Clear summaries older than specified days"""
         from datetime import timedelta
-        cutoff = datetime.now() - timedelta(days=days)
-        
-        to_delete = []
-        for sid, summary in self.data['summaries'].items():
-            try:
-                timestamp = datetime.fromisoformat(summary['timestamp'])
-                if timestamp < cutoff:
-                    to_delete.append(sid)
-            except:
-                continue
-        
-        for sid in to_delete:
-            self.delete_summary(sid)
-        
-        return len(to_delete)
+        with self._lock:
+            cutoff = datetime.now() - timedelta(days=days)
+            
+            to_delete = []
+            for sid, summary in self.data['summaries'].items():
+                try:
+                    timestamp = datetime.fromisoformat(summary['timestamp'])
+                    if timestamp < cutoff:
+                        to_delete.append(sid)
+                except:
+                    continue
+            
+            for sid in to_delete:
+                self.delete_summary(sid)
+            
+            return len(to_delete)
     
     def get_cache_stats(self) -> Dict:
         """Get statistics about cache usage"""
-        return {
-            'total_summaries': len(self.data['summaries']),
-            'total_urls': len(self.data.get('url_index', {})),
-            'storage_file': str(self.storage_file),
-            'file_size_kb': self.storage_file.stat().st_size / 1024 if self.storage_file.exists() else 0
-        }
+        with self._lock:
+            return {
+                'total_summaries': len(self.data['summaries']),
+                'total_urls': len(self.data.get('url_index', {})),
+                'storage_file': str(self.storage_file),
+                'file_size_kb': self.storage_file.stat().st_size / 1024 if self.storage_file.exists() else 0
+            }
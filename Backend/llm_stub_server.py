@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+OpenAI-Compatible LLM Stub
+Local stand-in for Perplexity, with configurable latency and failures, for
+exercising the LLM router (hedging, failover, rate limiting) without API costs
+
+Usage:
+    python llm_stub_server.py --port 8001 --latency 0.5
+    python llm_stub_server.py --port 8002 --latency 0.3 --slow-rate 0.1 --slow-latency 5
+    python llm_stub_server.py --port 8003 --error-rate 0.2 --rate-limit-rate 0.1
+
+Then point the backend at the stubs:
+    LLM_ENDPOINTS='[{"name": "stub-a", "base_url": "http://localhost:8001", "model": "stub"},
+                    {"name": "stub-b", "base_url": "http://localhost:8002", "model": "stub"}]'
+
+Replies are canned but follow the summary format (and the JSON schema when
+response_format asks for one); streaming requests are answered as SSE.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+app = Flask(__name__)
+
+settings = argparse.Namespace(latency=0.5, jitter=0.1, slow_rate=0.0, slow_latency=5.0,
+                              error_rate=0.0, rate_limit_rate=0.0)
+counters = {'requests': 0, 'slow': 0, 'errors': 0, 'rate_limited': 0}
+counters_lock = threading.Lock()
+
+FULL_SUMMARY = """# What You Need to Know
+
+## 🚫 Critical Issues
+🚫 Your data is shared with advertising partners
+🚫 Location is tracked even when the app is closed
+
+## ⚠️ Concerning Practices
+⚠️ Data is kept for up to 5 years after you leave
+
+## ✅ Good Practices
+✅ You can download and delete your data
+
+## ℹ️ Standard Practices
+ℹ️ Cookies are used to keep you logged in
+"""
+
+SHORT_SUMMARY = "🚫 Shares your data with advertisers and tracks location. ⚠️ Keeps data for years. ✅ You can delete it."
+
+STRUCTURED_REPLY = {
+    "short_summary": SHORT_SUMMARY,
+    "critical": ["Your data is shared with advertising partners",
+                 "Location is tracked even when the app is closed"],
+    "concerning": ["Data is kept for up to 5 years after you leave"],
+    "good": ["You can download and delete your data"],
+    "standard": ["Cookies are used to keep you logged in"],
+}
+
+
+def count(name):
+    with counters_lock:
+        counters[name] += 1
+
+
+def reply_for(body):
+    """Canned reply matching what the backend asked for"""
+    if (body.get('response_format') or {}).get('type') == 'json_schema':
+        return json.dumps(STRUCTURED_REPLY)
+    if body.get('max_tokens', 0) <= 300:
+        return SHORT_SUMMARY
+    return FULL_SUMMARY
+
+
+def completion(content, model, prompt_tokens):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                  "total_tokens": prompt_tokens + len(content) // 4},
+    }
+
+
+def stream_chunks(content, model, delay):
+    """SSE chunks a few words at a time, spread over `delay` seconds"""
+    words = content.split(" ")
+    pieces = [" ".join(words[i:i + 4]) + " " for i in range(0, len(words), 4)]
+    for piece in pieces:
+        chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": model, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        time.sleep(delay / len(pieces))
+    yield "data: [DONE]\n\n"
+
+
+@app.route('/chat/completions', methods=['POST'])
+def chat_completions():
+    body = request.get_json(force=True)
+    count('requests')
+
+    roll = random.random()
+    if roll < settings.rate_limit_rate:
+        count('rate_limited')
+        return jsonify({"error": {"message": "Rate limit exceeded (stub)", "type": "rate_limit"}}), 429, \
+            {'Retry-After': '1'}
+    if roll < settings.rate_limit_rate + settings.error_rate:
+        count('errors')
+        return jsonify({"error": {"message": "Internal error (stub)", "type": "server_error"}}), 500
+
+    delay = max(settings.latency + random.uniform(-settings.jitter, settings.jitter), 0)
+    if random.random() < settings.slow_rate:
+        count('slow')
+        delay = settings.slow_latency
+
+    content = reply_for(body)
+    model = body.get('model', 'stub')
+    if body.get('stream'):
+        time.sleep(min(delay, 0.2))  # time to first token
+        return Response(stream_chunks(content, model, delay), mimetype='text/event-stream')
+
+    time.sleep(delay)
+    prompt_tokens = sum(len(m.get('content') or '') for m in body.get('messages', [])) // 4
+    return jsonify(completion(content, model, prompt_tokens))
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    with counters_lock:
+        return jsonify(dict(counters, **vars(settings)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="Typical reply time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds around --latency")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of replies that take --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with 429")
+    args = parser.parse_args()
+
+    port = args.port
+    del args.port
+    settings.__dict__.update(vars(args))
+    print(f"🧪 LLM stub on http://localhost:{port} ({vars(settings)})")
+    app.run(host='127.0.0.1', port=port, threaded=True)
@@ -3,19 +3,46 @@
 policy_fetcher_safe.py
 
 Ethical, production-safe policy fetcher:
-- Tier 1: requests (static fetch)
-- Tier 2: Playwright fallback
+- Tier 1: requests (static fetch over a pooled keep-alive session)
+- Tier 2: Playwright fallback (pooled, long-lived browsers), only for
+  responses that look like they need JavaScript rendering
 - No bot-protection bypass attempts
 - Expanded policy paths + keywords
+- Streamed, size-capped downloads (non-HTML aborted before the body)
+- Conditional-GET revalidation cache for fetched policy text
+- Homepage link discovery before blind path probing
+- Single-pass page classification; best-scoring page wins per type
+- Per-site memory of dead paths and of the path that worked last time
+- Canonical origin (scheme + host after redirects) resolved once per site
+- Concurrent path probing (bounded pool + per-host limits)
+- Resumable bulk crawl of a domain list into a compressed store
 """
 
+import argparse
+import codecs
+import hashlib
 import os
 import re
 import sys
-import requests
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+from playwright.sync_api import TimeoutError as PWTimeoutError
+
+from services.browser_pool import get_browser_pool
+from services.crawl_checkpoint import CrawlCheckpoint
+from services.http_cache import HttpCache, get_http_cache
+from services.http_session import get_http_session
+from services.policy_classifier import Classification, PolicyClassifier
+from services.policy_store import PolicyStore
+from services.site_cache import get_site_cache
+from services.text_extract import get_extractor
 
 
 # =========================================================
@@ -34,6 +61,78 @@ HEADERS = {
 MIN_TEXT_LEN = 500
 OUT_DIR = "policies"
 
+# HTML-to-text backend: bs4 (default), lxml or selectolax
+TEXT_EXTRACTOR = os.environ.get("TEXT_EXTRACTOR", "bs4")
+
+# Concurrent probing
+PROBE_CONCURRENTLY = os.environ.get("FETCH_PROBE_CONCURRENTLY", "true").lower() == "true"
+PROBE_WORKERS = int(os.environ.get("FETCH_PROBE_WORKERS", 8))        # global bound
+PER_HOST_LIMIT = int(os.environ.get("FETCH_PER_HOST_LIMIT", 4))      # in-flight probes per host
+
+# Pooled HTTP session (static tier)
+HTTP_TIMEOUT = 15
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 50))  # hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", PER_HOST_LIMIT))  # connections per host
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", 0.5))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "false").lower() == "true"
+
+# Conditional-GET cache of cleaned policy text
+HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_DIR = os.environ.get(
+    "HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache")
+)
+HTTP_CACHE_MAX_MB = int(os.environ.get("HTTP_CACHE_MAX_MB", 100))
+
+# Per-site negative/positive path cache
+SITE_CACHE_ENABLED = os.environ.get("SITE_CACHE_ENABLED", "true").lower() == "true"
+SITE_CACHE_FILE = os.environ.get(
+    "SITE_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_cache.json")
+)
+DEAD_PATH_TTL_SCALE = float(os.environ.get("DEAD_PATH_TTL_SCALE", 1.0))  # multiplies per-reason TTLs
+
+# Canonical origin resolution (apex -> www., http -> https)
+RESOLVE_ORIGIN = os.environ.get("FETCH_RESOLVE_ORIGIN", "true").lower() == "true"
+CANONICAL_ORIGIN_TTL_HOURS = float(os.environ.get("CANONICAL_ORIGIN_TTL_HOURS", 7 * 24))
+# Unreachable sites are remembered as-is this long, so retries don't block every lookup
+CANONICAL_ORIGIN_FAILURE_TTL_HOURS = float(os.environ.get("CANONICAL_ORIGIN_FAILURE_TTL_HOURS", 0.25))
+
+# Playwright browser pool
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2))
+BROWSER_PAGES_PER_CONTEXT = int(os.environ.get("BROWSER_PAGES_PER_CONTEXT", 50))
+BROWSER_HEALTH_INTERVAL = float(os.environ.get("BROWSER_HEALTH_INTERVAL", 30))
+PLAYWRIGHT_JOB_TIMEOUT = 60  # seconds a caller waits for a pooled page
+
+# Playwright page loading
+RENDER_DEADLINE_MS = int(os.environ.get("RENDER_DEADLINE_MS", 10000))  # after DOMContentLoaded
+RENDER_POLL_MS = 250
+RENDER_STABLE_POLLS = 2   # text length unchanged this many polls in a row = ready
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "segment.io",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "adnxs.com",
+    "amazon-adsystem.com",
+)
+
+# Bulk crawl (--bulk); FETCH_PROBE_WORKERS still bounds probes across all sites
+BULK_WORKERS = int(os.environ.get("FETCH_BULK_WORKERS", 16))            # sites in flight
+BULK_OUT_FILE = os.environ.get("FETCH_BULK_OUT", "policies.jsonl.gz")
+BULK_CHECKPOINT_SECONDS = float(os.environ.get("FETCH_BULK_CHECKPOINT_SECONDS", 30))
+BULK_STATS_SECONDS = 10
+
 BOT_PHRASES = [
     "just a moment",
     "checking your browser",
@@ -44,6 +143,19 @@ BOT_PHRASES = [
     "security check",
 ]
 
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Streamed downloads: bodies over the cap are abandoned, not buffered
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", 5 * 1024 * 1024))
+FETCH_CHUNK_BYTES = 64 * 1024
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+# Markers of a client-rendered app whose HTML is only a mount point
+SPA_MARKERS = re.compile(
+    r"""id=["'](?:root|app|__next|__nuxt|svelte)["']|data-reactroot|ng-version=|<app-root""",
+    re.IGNORECASE,
+)
+
 # =========================================================
 # KEYWORDS (used for content validation)
 # =========================================================
@@ -125,6 +237,15 @@ COMMON_PATHS = {
     ],
 }
 
+# A page scoring at least this for a type is accepted without waiting
+# for lower-priority candidates; weaker matches compete on score
+STRONG_MATCH_SCORE = int(os.environ.get("FETCH_STRONG_MATCH_SCORE", 10))
+
+# Homepage link discovery
+DISCOVERY_ENABLED = os.environ.get("FETCH_DISCOVER_LINKS", "true").lower() == "true"
+DISCOVERY_MAX_LINKS = 3       # candidate links kept per policy type
+DISCOVERY_MAX_TEXT_LEN = 80   # longer anchor text is prose, not a footer link
+
 # =========================================================
 # AUTO-GENERATE POLICY_PATHS
 # =========================================================
@@ -143,22 +264,34 @@ for paths in COMMON_PATHS.values():
 # UTILITIES
 # =========================================================
 
+_extract_text = get_extractor(TEXT_EXTRACTOR)
+
+
 def clean_text(html: str) -> str:
-    soup = BeautifulSoup(html or "", "html.parser")
-    for tag in soup(["script", "style", "noscript", "iframe"]):
-        tag.decompose()
-    text = soup.get_text(" ", strip=True)
-    return re.sub(r"\s{2,}", " ", text)
+    """Visible text without scripts or nav/header/footer chrome."""
+    return _extract_text(html)
+
+
+_classifier = PolicyClassifier(KEYWORDS, BOT_PHRASES)
+
+
+@lru_cache(maxsize=16)
+def classify(text: str) -> Classification:
+    """
+    Per-type keyword scores and bot verdict from one scan of the text.
+
+    The last few results are kept, so is_bot_page() and contains_keywords()
+    on a page that was just classified don't scan it again.
+    """
+    return _classifier.classify(text)
 
 
 def is_bot_page(text: str) -> bool:
-    lower = (text or "").lower()
-    return any(p in lower for p in BOT_PHRASES)
+    return classify(text).bot_page
 
 
 def contains_keywords(text: str, policy_type: str) -> bool:
-    lower = (text or "").lower()
-    return any(k in lower for k in KEYWORDS.get(policy_type, []))
+    return classify(text).matches_type(policy_type)
 
 
 def safe_domain(url: str) -> str:
@@ -174,65 +307,677 @@ def save_file(domain: str, policy_type: str, text: str):
     print(f"[saved] {fname} ({len(text)} chars)")
 
 
+# =========================================================
+# TIER STATS
+# =========================================================
+
+_tier_stats = Counter()
+_tier_stats_lock = threading.Lock()
+
+
+def _count(key: str, n: int = 1):
+    with _tier_stats_lock:
+        _tier_stats[key] += n
+
+
+def get_tier_stats() -> dict:
+    """Counters for how often each fetch tier is used and why."""
+    with _tier_stats_lock:
+        stats = dict(_tier_stats)
+    renders = stats.get("playwright_requests", 0)
+    if renders:
+        stats["playwright_avg_render_ms"] = stats.get("playwright_render_ms", 0) // renders
+    return stats
+
+
 # =========================================================
 # TIER 1 — STATIC FETCH
 # =========================================================
 
-def fetch_static(url: str) -> str | None:
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
-        if r.status_code != 200:
-            return None
-        text = clean_text(r.text)
-        if len(text) < MIN_TEXT_LEN or is_bot_page(text):
-            return None
-        return text
-    except Exception:
+@dataclass
+class FetchOutcome:
+    """What a static fetch saw, used to decide whether to escalate."""
+    url: str
+    status: int | None = None
+    content_type: str = ""
+    text: str | None = None       # cleaned text, set only when usable
+    html: str | None = None       # raw body, only kept on request
+    text_len: int = 0
+    bot_page: bool = False
+    spa_shell: bool = False
+    too_large: bool = False
+    error: str | None = None
+    classification: Classification | None = None
+    render_ms: int | None = None  # Playwright tier only
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+
+def _accept_text(outcome: FetchOutcome, text: str) -> FetchOutcome:
+    """Classify cleaned text once and keep it if it is a usable page."""
+    outcome.classification = classify(text)
+    outcome.text_len = len(text)
+    outcome.bot_page = outcome.classification.bot_page
+    if outcome.text_len >= MIN_TEXT_LEN and not outcome.bot_page:
+        outcome.text = text
+    return outcome
+
+
+def _is_html(content_type: str) -> bool:
+    # A missing Content-Type is common on small sites; give it the benefit of the doubt
+    return not content_type or content_type.startswith(HTML_CONTENT_TYPES)
+
+
+def http_session():
+    return get_http_session(
+        headers=HEADERS,
+        timeout=HTTP_TIMEOUT,
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        retries=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        http2=HTTP2_ENABLED,
+    )
+
+
+def http_cache() -> HttpCache | None:
+    if not HTTP_CACHE_ENABLED:
         return None
+    return get_http_cache(directory=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _charset(content_type_header: str) -> str | None:
+    for param in content_type_header.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value.strip():
+            return value.strip().strip('"\'')
+    return None
+
+
+def _decoder(encoding: str | None, first_chunk: bytes):
+    """Incremental decoder: header charset, then <meta charset>, then UTF-8."""
+    if not encoding:
+        match = META_CHARSET.search(first_chunk[:4096])
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def read_capped(r, max_bytes: int = FETCH_MAX_BYTES) -> tuple[str, str]:
+    """
+    Stream a response body into text, decoding as it arrives.
+
+    Raises _TooLarge as soon as the declared or actual size passes
+    max_bytes, so memory per fetch never exceeds the cap.
+
+    Returns:
+        (text, sha256 of the raw body)
+    """
+    declared = r.headers.get("Content-Length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise _TooLarge()
+
+    encoding = _charset(r.headers.get("Content-Type", ""))
+    decoder = None
+    digest = hashlib.sha256()
+    parts = []
+    received = 0
+    for chunk in r.iter_bytes(FETCH_CHUNK_BYTES):
+        received += len(chunk)
+        if received > max_bytes:
+            raise _TooLarge()
+        digest.update(chunk)
+        if decoder is None:
+            decoder = _decoder(encoding, chunk)
+        parts.append(decoder.decode(chunk))
+    if decoder is not None:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), digest.hexdigest()
+
+
+def fetch_static(url: str, keep_html: bool = False) -> FetchOutcome:
+    outcome = FetchOutcome(url=url)
+    _count("static_requests")
+
+    # Revalidate instead of re-downloading when we have validators
+    # (not when the caller needs raw HTML: a 304 has no body)
+    cache = http_cache()
+    cached = cache.get(url) if cache and not keep_html else None
+
+    # At most two requests: a 304 whose cached text is gone is retried unconditionally
+    while True:
+        try:
+            with http_session().get(url, headers=HttpCache.conditional_headers(cached)) as r:
+                outcome.status = r.status_code
+                outcome.content_type = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if r.status_code == 304 and cached:
+                    text = cache.get_text(url)
+                    if text is not None:
+                        _count("static_not_modified")
+                        _count("static_ok")
+                        outcome.status = 200
+                        return _accept_text(outcome, text)
+                    # Validators without text to reuse (get_text dropped the entry):
+                    # a cache miss, not a dead page
+                    _count("static_not_modified_evicted")
+                    cached = None
+                    continue
+                # Decided on headers alone: the body is never downloaded
+                if r.status_code != 200 or not _is_html(outcome.content_type):
+                    return outcome
+                html, content_hash = read_capped(r)
+                etag = r.headers.get("ETag")
+                last_modified = r.headers.get("Last-Modified")
+                break
+        except _TooLarge:
+            outcome.too_large = True
+            _count("static_too_large")
+            return outcome
+        except Exception as e:
+            outcome.error = type(e).__name__
+            _count("static_errors")
+            return outcome
+
+    if keep_html:
+        outcome.html = html
+
+    # Same bytes as last time: reuse the cleaned text, skip parsing
+    if cached and cached.get('content_hash') == content_hash:
+        text = cache.get_text(url)
+        if text is not None:
+            _count("static_unchanged")
+            _count("static_ok")
+            return _accept_text(outcome, text)
+
+    text = clean_text(html)
+    _accept_text(outcome, text)
+    outcome.spa_shell = bool(SPA_MARKERS.search(html))
+    if outcome.ok:
+        _count("static_ok")
+        if cache:
+            cache.put(url, text, content_hash, etag=etag, last_modified=last_modified)
+    return outcome
+
+
+def escalation_reason(outcome: FetchOutcome) -> tuple[bool, str]:
+    """
+    Decide whether a failed static fetch is worth a headless browser.
+
+    Only a 200 HTML page that came back (nearly) empty suggests the content
+    is rendered by JavaScript. Missing pages, network errors, non-HTML
+    or oversized bodies and bot-protection pages will not be fixed by
+    Playwright.
+    """
+    if outcome.ok:
+        return False, "ok"
+    if outcome.error:
+        return False, "network_error"
+    if outcome.too_large:
+        return False, "too_large"
+    if outcome.status != 200:
+        return False, f"http_{outcome.status}"
+    if not _is_html(outcome.content_type):
+        return False, "not_html"
+    if outcome.bot_page:
+        return False, "bot_page"
+    if outcome.spa_shell:
+        return True, "spa_shell"
+    return True, "thin_content"
 
 
 # =========================================================
 # TIER 2 — PLAYWRIGHT FALLBACK
 # =========================================================
 
-def fetch_playwright(url: str) -> str | None:
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent=HEADERS["User-Agent"],
-            locale="en-US",
-            viewport={"width": 1920, "height": 1080},
-        )
-        page = context.new_page()
+def _browser_pool():
+    return get_browser_pool(
+        size=BROWSER_POOL_SIZE,
+        pages_per_context=BROWSER_PAGES_PER_CONTEXT,
+        health_interval=BROWSER_HEALTH_INTERVAL,
+        context_options={
+            "user_agent": HEADERS["User-Agent"],
+            "locale": "en-US",
+            "viewport": {"width": 1920, "height": 1080},
+        },
+    )
+
+
+def _block_unneeded(route):
+    """Skip assets that never carry policy text."""
+    request = route.request
+    host = urlparse(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        host == h or host.endswith("." + h) for h in BLOCKED_HOSTS
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _wait_until_ready(page, deadline: float) -> str:
+    """
+    Return as soon as the page looks rendered, or at the deadline.
+
+    Ready means the network went idle, or the visible text stopped
+    growing (and is long enough to be a policy) for a couple of polls.
+    """
+    last_len, stable = -1, 0
+    while time.monotonic() < deadline:
+        try:
+            page.wait_for_load_state("networkidle", timeout=RENDER_POLL_MS)
+            return "network_idle"
+        except PWTimeoutError:
+            pass
+        length = page.evaluate("document.body ? document.body.innerText.length : 0")
+        if length == last_len and length >= MIN_TEXT_LEN:
+            stable += 1
+            if stable >= RENDER_STABLE_POLLS:
+                return "text_stable"
+        else:
+            stable = 0
+        last_len = length
+    return "deadline"
+
+
+def _render(url: str):
+    def render(page) -> dict:
+        start = time.monotonic()
+        page.route("**/*", _block_unneeded)
         try:
             page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(3000)
+            ready = _wait_until_ready(page, time.monotonic() + RENDER_DEADLINE_MS / 1000)
             html = page.content()
-            text = clean_text(html)
-            if len(text) < MIN_TEXT_LEN or is_bot_page(text):
-                return None
-            return text
         except PWTimeoutError:
+            html, ready = None, "timeout"
+        return {
+            'html': html,
+            'ready': ready,
+            'render_ms': int((time.monotonic() - start) * 1000),
+        }
+    return render
+
+
+def render_html(url: str) -> tuple[str | None, int]:
+    """Raw HTML of a page after JavaScript has run, and the render time in ms."""
+    _count("playwright_requests")
+    result = _browser_pool().run(_render(url), timeout=PLAYWRIGHT_JOB_TIMEOUT)
+    _count("playwright_render_ms", result['render_ms'])
+    _count(f"playwright_ready_{result['ready']}")
+    print(f"[render] {url} {result['render_ms']}ms ({result['ready']})")
+    return result['html'], result['render_ms']
+
+
+def fetch_playwright(url: str) -> FetchOutcome:
+    outcome = FetchOutcome(url=url)
+    html, outcome.render_ms = render_html(url)
+    if html is None:
+        return outcome
+    _accept_text(outcome, clean_text(html))
+    if outcome.ok:
+        _count("playwright_ok")
+    return outcome
+
+
+def get_fetcher_stats() -> dict:
+    """Tier counters, connection reuse and browser pool health, for monitoring."""
+    return {
+        'tiers': get_tier_stats(),
+        'http': http_session().stats(),
+        'http_cache': http_cache().stats() if HTTP_CACHE_ENABLED else None,
+        'site_cache': site_cache().stats() if SITE_CACHE_ENABLED else None,
+        'browser_pool': _browser_pool().health_check(),
+    }
+
+
+# =========================================================
+# HOMEPAGE LINK DISCOVERY
+# =========================================================
+
+def _same_site(host: str, origin_host: str) -> bool:
+    """True for the origin itself and its subdomains (policies.example.com)."""
+    host = host.lower().split(":")[0]
+    base = origin_host.lower().split(":")[0]
+    if base.startswith("www."):
+        base = base[4:]
+    return host == base or host.endswith("." + base)
+
+
+def score_link(text: str, href: str, policy_type: str) -> int:
+    """
+    How strongly an anchor points at a policy type.
+
+    Keywords in the visible text count double; multi-word keywords
+    ("terms of service") outweigh single words ("terms").
+    """
+    text = text.lower() if len(text) <= DISCOVERY_MAX_TEXT_LEN else ""
+    path = urlparse(href).path.lower()
+    score = 0
+    for keyword in KEYWORDS.get(policy_type, []):
+        weight = len(keyword.split())
+        if keyword in text:
+            score += 2 * weight
+        slugs = {keyword.replace(" ", sep) for sep in ("-", "_", "")}
+        if any(slug in path for slug in slugs):
+            score += weight
+    return score
+
+
+def find_policy_links(html: str, origin: str) -> dict:
+    """
+    Score every anchor on a page against KEYWORDS.
+
+    Returns:
+        {policy_type: [url, ...]} best first, at most DISCOVERY_MAX_LINKS each
+    """
+    soup = BeautifulSoup(html or "", "html.parser")
+    origin_host = urlparse(origin).netloc
+    scored = {policy_type: {} for policy_type in KEYWORDS}
+
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        url = urljoin(origin + "/", href).split("#")[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not _same_site(parsed.netloc, origin_host):
+            continue
+        if parsed.path in ("", "/"):
+            continue
+
+        text = a.get_text(" ", strip=True)
+        for policy_type in KEYWORDS:
+            score = score_link(text, url, policy_type)
+            if score > scored[policy_type].get(url, 0):
+                scored[policy_type][url] = score
+
+    links = {}
+    for policy_type, urls in scored.items():
+        ranked = sorted(urls, key=urls.get, reverse=True)[:DISCOVERY_MAX_LINKS]
+        if ranked:
+            links[policy_type] = ranked
+    return links
+
+
+def discover_policy_links(origin: str) -> dict:
+    """
+    Fetch the homepage once and pull policy links out of it.
+
+    Links in the static HTML are used as-is, even on thin pages; the
+    homepage is only rendered when the static HTML has none.
+    """
+    outcome = fetch_static(origin, keep_html=True)
+    links = find_policy_links(outcome.html, origin) if outcome.html else {}
+    escalate, reason = escalation_reason(outcome)
+    if escalate and not links:
+        _count(f"escalated_{reason}")
+        try:
+            html, _ = render_html(origin)
+            links = find_policy_links(html, origin) if html else {}
+        except Exception as e:
+            print(f"[discovery] {origin} render failed: {e}")
+    _count("discovery_hits" if links else "discovery_misses")
+    return links
+
+
+# =========================================================
+# CONCURRENT PROBING
+# =========================================================
+
+_probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="probe")
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore limiting how many probes hit the same host at once."""
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = threading.BoundedSemaphore(PER_HOST_LIMIT)
+            _host_slots[host] = slot
+        return slot
+
+
+def fetch_tiered(url: str, cancelled: threading.Event | None = None) -> tuple[FetchOutcome, str]:
+    """
+    Static fetch first; Playwright only when the escalation policy says so.
+
+    Returns (outcome, reason): reason is "ok" or why the URL gave nothing.
+    """
+    outcome = fetch_static(url)
+    if outcome.ok:
+        return outcome, "ok"
+
+    escalate, reason = escalation_reason(outcome)
+    if not escalate:
+        _count(f"skipped_{reason}")
+        return outcome, reason
+    if cancelled is not None and cancelled.is_set():
+        return outcome, "cancelled"
+    _count(f"escalated_{reason}")
+    rendered = fetch_playwright(url)
+    return rendered, ("ok" if rendered.ok else "render_failed")
+
+
+def site_cache():
+    if not SITE_CACHE_ENABLED:
+        return None
+    return get_site_cache(storage_file=SITE_CACHE_FILE, ttl_scale=DEAD_PATH_TTL_SCALE)
+
+
+def check_candidate(url: str, policy_type: str,
+                    cancelled: threading.Event | None = None) -> tuple[str, int] | None:
+    """
+    Fetch a URL and validate it for a policy type, remembering failures.
+
+    Returns (text, score) when the page matches the type's keywords.
+    """
+    try:
+        outcome, reason = fetch_tiered(url, cancelled)
+    except Exception as e:
+        print(f"[probe] {url} failed: {e}")
+        outcome, reason = FetchOutcome(url=url), "error"
+
+    cache = site_cache()
+    if outcome.ok:
+        score = outcome.classification.score(policy_type)
+        if score > 0:
+            return outcome.text, score
+        if cache:
+            cache.mark_dead(url, "no_keywords", policy_type)
+    elif reason != "cancelled" and cache:
+        cache.mark_dead(url, reason)
+    return None
+
+
+def _probe(url: str, policy_type: str, cancelled: threading.Event) -> tuple[str, int] | None:
+    """Check one candidate URL; bails out early once its type is resolved."""
+    if cancelled.is_set():
+        return None
+    with _host_slot(url):
+        if cancelled.is_set():
             return None
-        finally:
-            browser.close()
+        return check_candidate(url, policy_type, cancelled)
+
+
+def _resolve(urls: list, futures: list) -> tuple[bool, tuple | None]:
+    """
+    Pick a type's page from its probes, in priority order.
+
+    Returns (resolved, (url, text) or None). The first page scoring
+    STRONG_MATCH_SCORE wins as soon as every probe ahead of it has
+    failed. Otherwise the type waits for all its probes and takes the
+    highest-scoring page (earlier candidates win ties).
+    """
+    best, best_score = None, 0
+    for url, future in zip(urls, futures):
+        if not future.done():
+            return False, None
+        hit = None if future.cancelled() else future.result()
+        if not hit:
+            continue
+        text, score = hit
+        if score >= STRONG_MATCH_SCORE:
+            return True, (url, text)
+        if score > best_score:
+            best, best_score = (url, text), score
+    return True, best
+
+
+def probe_concurrently(candidates: dict) -> dict:
+    """
+    Probe candidate URLs for several policy types in parallel.
+
+    Args:
+        candidates: {policy_type: [url, ...]} in priority order
+
+    Returns:
+        {policy_type: (url, text)} for every type that was found
+    """
+    cancel = {t: threading.Event() for t in candidates}
+    futures = {
+        t: [_probe_pool.submit(_probe, url, t, cancel[t]) for url in urls]
+        for t, urls in candidates.items()
+    }
+
+    found = {}
+    unresolved = set(candidates)
+    while unresolved:
+        for policy_type in list(unresolved):
+            resolved, hit = _resolve(candidates[policy_type], futures[policy_type])
+            if not resolved:
+                continue
+            unresolved.discard(policy_type)
+            cancel[policy_type].set()
+            for future in futures[policy_type]:
+                future.cancel()
+            if hit:
+                found[policy_type] = hit
+
+        pending = [f for t in unresolved for f in futures[t] if not f.done()]
+        if pending:
+            wait(pending, return_when=FIRST_COMPLETED)
+
+    return found
+
+
+def probe_sequentially(candidates: dict) -> dict:
+    """One URL at a time; stops early on a strong match, else keeps the best."""
+    found = {}
+    for policy_type, urls in candidates.items():
+        best_score = 0
+        for url in urls:
+            hit = check_candidate(url, policy_type)
+            if not hit:
+                continue
+            text, score = hit
+            if score > best_score:
+                found[policy_type] = (url, text)
+                best_score = score
+            if score >= STRONG_MATCH_SCORE:
+                break
+    return found
+
+
+# =========================================================
+# CANONICAL ORIGIN
+# =========================================================
+
+def _follow_redirects(origin: str) -> str | None:
+    """
+    Where the origin's homepage ends up, or None if it is unreachable.
+
+    Only the final URL is needed, so the body is never read. Redirects
+    off-site (a login wall, a parent brand) don't count: the site keeps
+    its own host.
+    """
+    host = urlparse(origin).netloc
+    attempts = [origin]
+    if origin.startswith("https://"):
+        attempts.append("http://" + host)  # HTTP-only sites
+    for start in attempts:
+        try:
+            with http_session().get(start + "/") as r:
+                final = urlparse(r.url)
+        except Exception as e:
+            print(f"[origin] {start} unreachable: {type(e).__name__}")
+            continue
+        if final.scheme in ("http", "https") and final.netloc and _same_site(final.netloc, host):
+            return f"{final.scheme}://{final.netloc}"
+        return start
+    return None
+
+
+def request_origin(site: str) -> str:
+    """
+    Scheme and host as given, without any network access, e.g.
+    "example.com/about" -> "https://example.com".
+    """
+    if "://" not in site:
+        site = "https://" + site  # not startswith("http"): "httpbin.org"
+    parsed = urlparse(site)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
 
 
+def canonical_origin(site: str) -> str:
+    """
+    Scheme and host a site actually serves from, e.g.
+    "example.com" -> "https://www.example.com".
+
+    Resolved by following redirects once, then remembered in the site
+    cache for CANONICAL_ORIGIN_TTL_HOURS, so later probes skip the
+    redirect hop. Unreachable sites are returned as given and remembered
+    that way for CANONICAL_ORIGIN_FAILURE_TTL_HOURS.
+    """
+    origin = request_origin(site)
+    if not RESOLVE_ORIGIN:
+        return origin
+
+    cache = site_cache()
+    known = cache.get_canonical(origin) if cache else None
+    if known:
+        return known
+
+    resolved = _follow_redirects(origin)
+    if resolved is None:
+        if cache:
+            cache.set_canonical(origin, origin, CANONICAL_ORIGIN_FAILURE_TTL_HOURS)
+            cache.flush()
+        return origin
+    if resolved != origin:
+        print(f"[origin] {origin} -> {resolved}")
+    if cache:
+        cache.set_canonical(origin, resolved, CANONICAL_ORIGIN_TTL_HOURS)
+        cache.set_canonical(resolved, resolved, CANONICAL_ORIGIN_TTL_HOURS)
+        cache.flush()
+    return resolved
+
 
 # =========================================================
 # API FUNCTION (for app.py integration)
 # =========================================================
 
-def fetch_policy_for_url(site: str) -> dict:
+def fetch_policy_for_url(site: str, concurrent: bool | None = None) -> dict:
     """
     Fetch policies for a website and return text (for API use)
     
     Args:
         site: Website URL (e.g., "github.com" or "https://github.com")
+        concurrent: Probe all candidate paths in parallel
+                    (defaults to FETCH_PROBE_CONCURRENTLY)
     
     Returns:
         dict: {
-            'url': 'github.com',
+            'url': 'github.com',      # canonical host (see canonical_origin)
             'policies': {
                 'privacy': 'policy text...',
                 'terms': 'policy text...',
@@ -241,11 +986,8 @@ def fetch_policy_for_url(site: str) -> dict:
             'found_types': ['privacy', 'terms']
         }
     """
-    if not site.startswith("http"):
-        site = "https://" + site
-
-    parsed = urlparse(site)
-    origin = f"{parsed.scheme}://{parsed.netloc}"
+    origin = canonical_origin(site)
+    parsed = urlparse(origin)
     
     result = {
         'url': parsed.netloc,
@@ -253,62 +995,267 @@ def fetch_policy_for_url(site: str) -> dict:
         'found_types': []
     }
 
+    if concurrent is None:
+        concurrent = PROBE_CONCURRENTLY
+    http_before = http_session().stats()
+    probe = probe_concurrently if concurrent else probe_sequentially
+    cache = site_cache()
+
+    def alive(policy_type, urls):
+        return [u for u in urls if not (cache and cache.is_dead(u, policy_type))]
+
+    # Stage 0: whatever worked for this site last time
+    found = {}
+    if cache:
+        working = cache.get_working(origin)
+        if working:
+            found = probe({t: [url] for t, url in working.items()})
+            for policy_type in working:
+                if policy_type not in found:
+                    cache.forget_working(origin, policy_type)
+    missing = [t for t in COMMON_PATHS if t not in found]
+
+    # Stage 1: links the site itself advertises
+    tried = set()
+    if missing and DISCOVERY_ENABLED:
+        discovered = discover_policy_links(origin)
+        candidates = {t: alive(t, discovered[t]) for t in missing if t in discovered}
+        candidates = {t: urls for t, urls in candidates.items() if urls}
+        tried = {url for urls in candidates.values() for url in urls}
+        if candidates:
+            found.update(probe(candidates))
+
+    # Stage 2: guess COMMON_PATHS, only for types still missing
+    fallback = {}
     for policy_type, paths in COMMON_PATHS.items():
-        for path in paths:
-            url = urljoin(origin, path)
-            
-            text = fetch_static(url)
-            if not text:
-                text = fetch_playwright(url)
-
-            if text and contains_keywords(text, policy_type):
-                result['policies'][policy_type] = text
-                result['found_types'].append(policy_type)
-                break
+        if policy_type in found:
+            continue
+        urls = [urljoin(origin, path) for path in paths]
+        urls = alive(policy_type, [url for url in urls if url not in tried])
+        if urls:
+            fallback[policy_type] = urls
+    if fallback:
+        found.update(probe(fallback))
+
+    # Keep COMMON_PATHS order so callers see a stable found_types list
+    for policy_type in COMMON_PATHS:
+        if policy_type in found:
+            url, text = found[policy_type]
+            result['policies'][policy_type] = text
+            result['found_types'].append(policy_type)
+            if cache:
+                cache.mark_working(origin, policy_type, url)
+    if cache:
+        cache.flush()
+
+    # Approximate under concurrent lookups: counters are process-wide
+    http_after = http_session().stats()
+    requests_made = http_after['requests'] - http_before['requests']
+    handshakes = http_after['tls_handshakes'] - http_before['tls_handshakes']
+    print(f"[http] {parsed.netloc}: {requests_made} requests, {handshakes} TLS handshakes")
 
     return result
 
 
 # =========================================================
-# MAIN (CLI usage)
+# BULK CRAWL
 # =========================================================
 
-def main(site: str):
-    if not site.startswith("http"):
-        site = "https://" + site
+def load_domains(path: str) -> list:
+    """
+    Read a domain list: one domain or URL per line, or "rank,domain"
+    CSV as published by top-sites lists. Blank lines and # comments are
+    skipped; duplicates keep their first position.
+    """
+    domains, seen = [], set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = line.rsplit(",", 1)[-1].strip()
+            netloc = urlparse(entry if "://" in entry else "https://" + entry).netloc.lower()
+            if netloc and netloc not in seen:
+                seen.add(netloc)
+                domains.append(netloc)
+    return domains
 
-    parsed = urlparse(site)
-    origin = f"{parsed.scheme}://{parsed.netloc}"
-    domain = safe_domain(site)
 
-    print(f"\nTarget: {origin}\n")
+def crawl_site(domain: str) -> dict:
+    """One bulk-crawl record: the fetch result, or the error that stopped it."""
+    start = time.time()
+    record = {'domain': domain, 'fetched_at': datetime.now().isoformat()}
+    try:
+        result = fetch_policy_for_url(domain)
+        record.update(url=result['url'], found_types=result['found_types'],
+                      policies=result['policies'])
+        record['status'] = "ok" if result['found_types'] else "empty"
+    except Exception as e:
+        print(f"[bulk] {domain} failed: {e}")
+        record.update(status="error", error=str(e), found_types=[], policies={})
+    record['elapsed_ms'] = int((time.time() - start) * 1000)
+    return record
 
-    for policy_type, paths in COMMON_PATHS.items():
-        print(f"\n[{policy_type.upper()}]")
-        found = False
 
-        for path in paths:
-            url = urljoin(origin, path)
-            print(f"  → Trying {url}")
+def _print_bulk_stats(counts: Counter, total: int, resumed: int, started: float,
+                      window: tuple[float, int]) -> tuple[float, int]:
+    """One live progress line; returns the new (time, finished) rate window."""
+    now = time.time()
+    finished = counts['ok'] + counts['empty'] + counts['error']
+    rate = finished / max(now - started, 1e-6)
+    recent = (finished - window[1]) / max(now - window[0], 1e-6)
+    failed = counts['empty'] + counts['error']
+    remaining = total - resumed - finished
+    eta = f"{remaining / rate / 60:.0f}m" if rate > 0 else "?"
+    print(f"[bulk] {resumed + finished}/{total} sites | {recent:.2f} sites/s now, "
+          f"{rate:.2f} avg | {counts['policies'] / max(now - started, 1e-6):.2f} policies/s | "
+          f"failed {100 * failed / max(finished, 1):.1f}% "
+          f"(empty {counts['empty']}, error {counts['error']}) | ETA {eta}")
+    return now, finished
+
+
+def bulk_crawl(domains_file: str, out_path: str = BULK_OUT_FILE,
+               workers: int = BULK_WORKERS, retry_errors: bool = False) -> Counter:
+    """
+    Crawl every domain in a list into an append-only compressed store.
+
+    Args:
+        domains_file: Domain list (see load_domains)
+        out_path: gzip JSON Lines store, one record per site (see crawl_site)
+        workers: Sites fetched at once; probes across all sites share the
+                 FETCH_PROBE_WORKERS pool and the per-host limit
+        retry_errors: Crawl again domains whose last attempt raised
 
-            text = fetch_static(url)
-            if not text:
-                text = fetch_playwright(url)
+    Progress is checkpointed to <out_path>.checkpoint.json every
+    FETCH_BULK_CHECKPOINT_SECONDS; rerunning the same command resumes
+    from the last checkpoint.
 
-            if text and contains_keywords(text, policy_type):
-                save_file(domain, policy_type, text)
-                found = True
+    Returns:
+        Counter of ok / empty / error sites and policies found this run
+    """
+    checkpoint = CrawlCheckpoint(out_path + ".checkpoint.json")
+    # Resuming truncates the store to the checkpoint, so never adopt a store without one
+    if os.path.exists(out_path) and os.path.getsize(out_path) and not checkpoint.storage_file.exists():
+        raise SystemExit(f"{out_path} exists but has no checkpoint; choose another output file")
+    if not checkpoint.storage_file.exists():
+        # Claim the store before the first append, so a crash before the first
+        # periodic checkpoint still resumes (from an empty store)
+        checkpoint.save(0)
+    store = PolicyStore(out_path)
+    store.truncate(checkpoint.store_bytes)
+    if retry_errors:
+        checkpoint.done = {d: s for d, s in checkpoint.done.items() if s != "error"}
+
+    domains = load_domains(domains_file)
+    todo = [d for d in domains if not checkpoint.is_done(d)]
+    resumed = len(domains) - len(todo)
+    print(f"\nBulk crawl: {len(domains)} domains, {resumed} already done, "
+          f"{workers} sites in flight -> {out_path}\n")
+
+    cache = site_cache()
+    if cache:
+        cache.flush_interval = BULK_CHECKPOINT_SECONDS
+
+    def save_checkpoint():
+        store.sync()
+        checkpoint.save(store.size)
+        if cache:
+            cache.flush(force=True)
+        if http_cache():
+            http_cache().flush(force=True)
+
+    counts = Counter()
+    started = time.time()
+    window = (started, 0)
+    last_checkpoint = last_report = started
+    queue = iter(todo)
+    pending = set()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk")
+    try:
+        while True:
+            # Bounded submission: a 50k-domain list never sits in the executor queue
+            while len(pending) < workers * 2:
+                domain = next(queue, None)
+                if domain is None:
+                    break
+                pending.add(pool.submit(crawl_site, domain))
+            if not pending:
                 break
 
-        if not found:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            # Records are only written here, so store and checkpoint stay in step
+            for future in done:
+                record = future.result()
+                store.append(record)
+                checkpoint.mark_done(record['domain'], record['status'])
+                counts[record['status']] += 1
+                counts['policies'] += len(record['found_types'])
+
+            now = time.time()
+            if now - last_checkpoint >= BULK_CHECKPOINT_SECONDS:
+                save_checkpoint()
+                last_checkpoint = now
+            if now - last_report >= BULK_STATS_SECONDS:
+                window = _print_bulk_stats(counts, len(domains), resumed, started, window)
+                last_report = now
+    except KeyboardInterrupt:
+        print("\n[bulk] Interrupted; saving checkpoint. Rerun the same command to resume.")
+        pool.shutdown(wait=False, cancel_futures=True)
+        save_checkpoint()
+        store.close()
+        raise
+
+    pool.shutdown()
+    save_checkpoint()
+    store.close()
+    _print_bulk_stats(counts, len(domains), resumed, started, window)
+    print(f"\nDone. {counts['ok']} sites with policies, {counts['policies']} policies -> {out_path}")
+    print(f"Tier stats: {get_tier_stats()}")
+    print(f"HTTP stats: {http_session().stats()}")
+    return counts
+
+
+# =========================================================
+# MAIN (CLI usage)
+# =========================================================
+
+def main(site: str):
+    origin = canonical_origin(site)
+    domain = safe_domain(origin)
+
+    print(f"\nTarget: {origin}\n")
+
+    result = fetch_policy_for_url(origin)
+    for policy_type in COMMON_PATHS:
+        print(f"\n[{policy_type.upper()}]")
+        if policy_type in result['policies']:
+            save_file(domain, policy_type, result['policies'][policy_type])
+        else:
             print("  ✗ Not found or blocked")
 
     print("\nDone. Check ./policies directory.")
+    print(f"Tier stats: {get_tier_stats()}")
+    print(f"HTTP stats: {http_session().stats()}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python policy_fetcher_safe.py <website>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Fetch privacy/terms/cookie policies")
+    parser.add_argument("site", nargs="?", help="Website to fetch, e.g. github.com")
+    parser.add_argument("--bulk", metavar="DOMAINS_FILE",
+                        help="Crawl every domain in a list (resumable)")
+    parser.add_argument("--out", default=BULK_OUT_FILE, help="Bulk output store (.jsonl.gz)")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help="Sites crawled at once")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="Retry domains that errored in an earlier run")
+    args = parser.parse_args()
 
-    main(sys.argv[1])
+    if args.bulk:
+        try:
+            bulk_crawl(args.bulk, args.out, args.workers, args.retry_errors)
+        except KeyboardInterrupt:
+            sys.exit(130)
+    elif args.site:
+        main(args.site)
+    else:
+        parser.print_help()
+        sys.exit(1)
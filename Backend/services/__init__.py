@@ -0,0 +1,4 @@
+"""
+Services Package
+Long-lived helpers shared by the policy fetcher and the API
+"""
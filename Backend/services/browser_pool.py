@@ -0,0 +1,244 @@
+"""
+Playwright Browser Pool
+Long-lived headless Chromium instances shared across requests
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
+
+from playwright.sync_api import sync_playwright, Error as PWError
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of headless browsers.
+
+    Playwright's sync API is bound to the thread that created it, so every
+    slot is a worker thread that owns one browser and one context. Callers
+    hand a function to `run()`; a worker opens a page in its context, calls
+    the function with it and returns the result.
+
+    Contexts are recycled after `pages_per_context` pages or when a page
+    crashes. Idle workers periodically check that their browser is still
+    connected and relaunch it if not.
+    """
+
+    def __init__(self, size: int = 2, pages_per_context: int = 50,
+                 health_interval: float = 30.0,
+                 launch_options: Optional[Dict] = None,
+                 context_options: Optional[Dict] = None):
+        self.size = size
+        self.pages_per_context = pages_per_context
+        self.health_interval = health_interval
+        self.launch_options = launch_options or {"headless": True}
+        self.context_options = context_options or {}
+
+        self._jobs = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._slots: List[Dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Start worker threads (browsers launch lazily on first job)"""
+        with self._lock:
+            if self._workers or self._closed:
+                return
+            for i in range(self.size):
+                slot = {
+                    'slot': i,
+                    'connected': False,
+                    'pages_served': 0,
+                    'pages_in_context': 0,
+                    'contexts_created': 0,
+                    'browsers_launched': 0,
+                    'crashes': 0,
+                    'dead': False,
+                    'last_health_check': None,
+                }
+                self._slots.append(slot)
+                worker = threading.Thread(
+                    target=self._worker_loop, args=(slot,),
+                    name=f"browser-pool-{i}", daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+
+    def run(self, fn: Callable, timeout: Optional[float] = None):
+        """
+        Run `fn(page)` on a pooled page and return its result
+
+        Exceptions raised by `fn` are re-raised in the caller. A job still
+        queued when `timeout` runs out is cancelled, so no worker renders it
+        after the caller has given up.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        self.start()
+        with self._lock:
+            if all(s['dead'] for s in self._slots):
+                raise RuntimeError("No live browsers in pool")
+        future = Future()
+        self._jobs.put((fn, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def health_check(self) -> Dict:
+        """Snapshot of every slot's state"""
+        with self._lock:
+            slots = [dict(s) for s in self._slots]
+        return {
+            'size': self.size,
+            'queued_jobs': self._jobs.qsize(),
+            'healthy_slots': sum(1 for s in slots if s['connected']),
+            'slots': slots,
+        }
+
+    def close(self):
+        """Stop workers and close their browsers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join(timeout=10)
+
+    # -----------------------------------------------------
+    # Worker side (everything below runs on a slot thread)
+    # -----------------------------------------------------
+
+    def _worker_loop(self, slot: Dict):
+        try:
+            with sync_playwright() as pw:
+                self._serve(pw, slot)
+        except Exception as e:
+            print(f"[browser-pool] slot {slot['slot']} died: {e}")
+            self._set(slot, connected=False, dead=True)
+
+    def _serve(self, pw, slot: Dict):
+        browser = None
+        context = None
+
+        while True:
+            try:
+                job = self._jobs.get(timeout=self.health_interval)
+            except queue.Empty:
+                browser, context = self._check_health(slot, browser, context)
+                continue
+            if job is None:
+                break
+
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if browser is None or not browser.is_connected():
+                    browser, context = self._launch(pw, slot, browser)
+                if context is None or slot['pages_in_context'] >= self.pages_per_context:
+                    context = self._new_context(slot, browser, context)
+                page = context.new_page()
+            except PWError as e:
+                # Could not even get a page: start from a fresh browser next time
+                self._bump(slot, crashes=1)
+                context = self._discard_context(context)
+                if browser is not None:
+                    self._close_quietly(browser)
+                browser = None
+                self._set(slot, connected=False)
+                future.set_exception(e)
+                continue
+
+            crashed = []
+            page.on("crash", lambda _: crashed.append(True))
+            try:
+                future.set_result(fn(page))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._close_quietly(page)
+                self._bump(slot, pages_served=1, pages_in_context=1)
+
+            if crashed or not browser.is_connected():
+                # Recycle the context after a page crash or a dropped browser
+                self._bump(slot, crashes=1)
+                context = self._discard_context(context)
+
+        self._discard_context(context)
+        if browser is not None:
+            self._close_quietly(browser)
+        self._set(slot, connected=False)
+
+    def _launch(self, pw, slot: Dict, old_browser):
+        if old_browser is not None:
+            self._close_quietly(old_browser)
+        browser = pw.chromium.launch(**self.launch_options)
+        self._bump(slot, browsers_launched=1)
+        self._set(slot, connected=True, pages_in_context=0)
+        return browser, None
+
+    def _new_context(self, slot: Dict, browser, old_context):
+        self._discard_context(old_context)
+        context = browser.new_context(**self.context_options)
+        self._bump(slot, contexts_created=1)
+        self._set(slot, pages_in_context=0)
+        return context
+
+    def _discard_context(self, context):
+        if context is not None:
+            self._close_quietly(context)
+        return None
+
+    def _check_health(self, slot: Dict, browser, context):
+        healthy = browser is not None and browser.is_connected()
+        if browser is not None and not healthy:
+            print(f"[browser-pool] slot {slot['slot']} lost its browser, relaunching on next job")
+            self._discard_context(context)
+            self._close_quietly(browser)
+            browser, context = None, None
+        self._set(slot, connected=healthy, last_health_check=time.time())
+        return browser, context
+
+    def _bump(self, slot: Dict, **counters):
+        with self._lock:
+            for key, n in counters.items():
+                slot[key] += n
+
+    def _set(self, slot: Dict, **values):
+        with self._lock:
+            slot.update(values)
+
+    @staticmethod
+    def _close_quietly(obj):
+        try:
+            obj.close()
+        except Exception:
+            pass
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(**kwargs) -> BrowserPool:
+    """
+    Process-wide pool, created on first use
+
+    kwargs are only applied when the pool is first created.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(**kwargs)
+            atexit.register(_pool.close)
+        return _pool
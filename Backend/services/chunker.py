@@ -0,0 +1,105 @@
+"""
+Token-Aware Chunking
+Splits long policy text into pieces that fit an LLM token budget
+"""
+
+import math
+import re
+from typing import List, Tuple
+
+
+# Conservative for English legal text (~4 chars/token with Llama/GPT
+# tokenizers); overestimating only makes chunks a little smaller
+CHARS_PER_TOKEN = 3.5
+
+# app.py joins fetched policies as "\n\n=== PRIVACY POLICY ===\n\n<text>"
+POLICY_MARKER = re.compile(r"^=== ([A-Z][A-Z ]*?) POLICY ===$", re.MULTILINE)
+
+# Preferred split points, best first. All are zero-width, so joining the
+# pieces gives back the original text.
+SPLIT_PATTERNS = [
+    # Paragraphs (uploaded text keeps its line breaks)
+    re.compile(r"(?=\n\s*\n)"),
+    # Section headings: markdown, "4.2 Sharing Your Data", ALL-CAPS lines
+    re.compile(r"(?=\n#{1,6}\s)|(?=\s\d{1,2}(?:\.\d{1,2})*\.?\s+[A-Z][a-z])|(?=\n[A-Z][A-Z0-9 ,&'-]{5,}\n)"),
+    # Sentences
+    re.compile(r"(?<=[.!?])(?=\s)"),
+    # Words
+    re.compile(r"(?=\s)"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without a model-specific tokenizer"""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def split_policies(text: str) -> List[Tuple[str, str]]:
+    """
+    Split combined text on its === TYPE POLICY === markers
+
+    Returns [(policy_type, body)], policy_type lowercase; text with no
+    markers (an uploaded policy) is one ("", text) entry.
+    """
+    parts = []
+    matches = list(POLICY_MARKER.finditer(text or ""))
+    preamble = (text or "")[:matches[0].start()] if matches else (text or "")
+    if preamble.strip():
+        parts.append(("", preamble.strip()))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            parts.append((match.group(1).lower(), body))
+    return parts
+
+
+def _split(text: str, max_tokens: int, level: int = 0) -> List[str]:
+    """Pieces of at most max_tokens, split at the best boundary that works"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    if level >= len(SPLIT_PATTERNS):
+        # One unbroken run (no whitespace): hard cut
+        size = int(max_tokens * CHARS_PER_TOKEN)
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    pieces = [p for p in SPLIT_PATTERNS[level].split(text) if p]
+    if len(pieces) == 1:
+        return _split(text, max_tokens, level + 1)
+
+    # Greedily pack neighbouring pieces; oversized ones split further
+    chunks, current = [], ""
+    for piece in pieces:
+        if estimate_tokens(current + piece) <= max_tokens:
+            current += piece
+            continue
+        if current:
+            chunks.append(current)
+        if estimate_tokens(piece) <= max_tokens:
+            current = piece
+        else:
+            chunks.extend(_split(piece, max_tokens, level + 1))
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_policy_text(text: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """
+    Split combined policy text into chunks of at most ~max_tokens
+
+    Returns [(policy_type, chunk)]. Chunks never span two policies; each
+    one starts with its policy's marker (numbered when the policy is
+    split), so a chunk read on its own still says what it is.
+    """
+    chunks = []
+    for policy_type, body in split_policies(text):
+        marker = f"{policy_type.upper()} POLICY" if policy_type else "POLICY"
+        # Leave room for the marker line
+        pieces = [p.strip() for p in _split(body, max(max_tokens - 16, 1))]
+        pieces = [p for p in pieces if p]
+        for i, piece in enumerate(pieces):
+            part = f" (part {i + 1} of {len(pieces)})" if len(pieces) > 1 else ""
+            chunks.append((policy_type, f"=== {marker}{part} ===\n\n{piece}"))
+    return chunks
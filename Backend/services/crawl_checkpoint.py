@@ -0,0 +1,68 @@
+"""
+Bulk Crawl Checkpoint
+Records which domains a bulk crawl has finished, so a killed run can resume
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+
+class CrawlCheckpoint:
+    """
+    JSON file next to the policy store
+
+    Layout:
+        {
+            "store_bytes": 123456,                 # store size covering every "done" entry
+            "done": {"github.com": "ok", "example.org": "empty"},
+            "updated": 1700000000
+        }
+
+    Finished domains are buffered in memory; `save(store_bytes)` writes
+    them together with the store size they were written up to. On resume
+    the store is truncated to `store_bytes`, so any record appended after
+    the last save (and possibly cut off mid-write) is dropped and its
+    domain is crawled again.
+    """
+
+    def __init__(self, storage_file='policies.jsonl.gz.checkpoint.json'):
+        self.storage_file = Path(storage_file)
+        self._lock = threading.Lock()
+        data = self._load()
+        self.store_bytes = data.get('store_bytes', 0)
+        self.done: Dict[str, str] = data.get('done', {})
+        self._pending: Dict[str, str] = {}
+
+    def _load(self) -> Dict:
+        """Load data from JSON file"""
+        if self.storage_file.exists():
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {}
+        return {}
+
+    def is_done(self, domain: str) -> bool:
+        return domain in self.done
+
+    def mark_done(self, domain: str, status: str):
+        """Buffer a finished domain until the next save()"""
+        with self._lock:
+            self._pending[domain] = status
+
+    def save(self, store_bytes: int):
+        """Commit buffered domains; the store must already be synced to store_bytes"""
+        with self._lock:
+            self.done.update(self._pending)
+            self._pending.clear()
+            self.store_bytes = store_bytes
+            tmp = self.storage_file.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'store_bytes': store_bytes, 'done': self.done,
+                           'updated': time.time()}, f)
+            os.replace(tmp, self.storage_file)
@@ -0,0 +1,215 @@
+"""
+HTTP Revalidation Cache
+On-disk store of cleaned policy text with ETag / Last-Modified validators
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class HttpCache:
+    """
+    Size-bounded LRU cache keyed by URL
+
+    Layout (JSON index like the summaries database, one text file per URL):
+        <directory>/index.json      url -> validators, content hash, size, last use
+        <directory>/<key>.txt       cleaned text for that URL
+
+    Only the cleaned text is stored, so a 304 (or an unchanged body) can
+    skip HTML parsing entirely.
+
+    Index changes, including each lookup's `last_used`, are buffered and
+    appended to <directory>/index.log by `flush()`, at most every
+    `flush_interval` seconds unless forced. Each changed URL gets one
+    compact JSON line. The log is replayed over index.json on load, and
+    folded back into it once it has more lines than the index has entries.
+    """
+
+    MIN_COMPACT_LINES = 1000
+
+    def __init__(self, directory='http_cache', max_bytes: int = 100 * 1024 * 1024,
+                 flush_interval: float = 5):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.index_file = self.directory / 'index.json'
+        self.log_file = self.directory / 'index.log'
+        self._lock = threading.Lock()
+        self._dirty = set()  # URLs changed since the last flush
+        self._log_lines = 0
+        self._flushed_at = 0.0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index = self._load()
+        self._total = sum(e['size'] for e in self.index.values())
+
+    def _load(self) -> Dict:
+        """Load the index, then replay the change log over it"""
+        index = {}
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+        if self.log_file.exists():
+            try:
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            change = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line from an interrupted write
+                        self._log_lines += 1
+                        if change['entry'] is None:
+                            index.pop(change['url'], None)
+                        else:
+                            index[change['url']] = change['entry']
+            except OSError:
+                pass
+        return index
+
+    def flush(self, force: bool = False):
+        """Write pending index changes to disk"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.time() - self._flushed_at < self.flush_interval:
+                return
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                for url in self._dirty:
+                    change = {'url': url, 'entry': self.index.get(url)}
+                    f.write(json.dumps(change, separators=(',', ':')) + '\n')
+            self._log_lines += len(self._dirty)
+            self._dirty.clear()
+            if self._log_lines > max(len(self.index), self.MIN_COMPACT_LINES):
+                self._compact()
+            self._flushed_at = time.time()
+
+    def _compact(self):
+        """Rewrite index.json from memory and empty the log (lock held)"""
+        tmp = self.index_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, separators=(',', ':'))
+        os.replace(tmp, self.index_file)
+        self.log_file.unlink(missing_ok=True)
+        self._log_lines = 0
+
+    def _text_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return self.directory / f"{key}.txt"
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Entry metadata for a URL (without the text), or None"""
+        with self._lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return None
+            entry['last_used'] = time.time()
+            self._dirty.add(url)
+            return dict(entry)
+
+    def get_text(self, url: str) -> Optional[str]:
+        """Stored cleaned text; drops the entry if its file went missing"""
+        with self._lock:
+            try:
+                return self._text_path(url).read_text(encoding='utf-8')
+            except OSError:
+                self._drop(url)
+                return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        """If-None-Match / If-Modified-Since for a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, text: str, content_hash: str,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Store cleaned text and validators, evicting LRU entries over the size bound
+
+        content_hash is any stable digest of the raw body (the fetcher uses sha256).
+        """
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._text_path(url).write_text(text, encoding='utf-8')
+            previous = self.index.get(url)
+            self._total += size - (previous['size'] if previous else 0)
+            self.index[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_hash': content_hash,
+                'size': size,
+                'stored_at': time.time(),
+                'last_used': time.time(),
+            }
+            self._dirty.add(url)
+            self._evict()
+        self.flush()
+
+    def delete(self, url: str):
+        with self._lock:
+            self._drop(url)
+        self.flush()
+
+    def _drop(self, url: str):
+        """Remove an entry and its text (lock held)"""
+        entry = self.index.pop(url, None)
+        if entry is not None:
+            self._total -= entry['size']
+            self._remove_file(url)
+            self._dirty.add(url)
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for url in sorted(self.index, key=lambda u: self.index[u]['last_used']):
+            self._drop(url)
+            if self._total <= self.max_bytes:
+                break
+
+    def _remove_file(self, url: str):
+        try:
+            self._text_path(url).unlink()
+        except OSError:
+            pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self.index),
+                'size_kb': self._total / 1024,
+                'max_size_kb': self.max_bytes / 1024,
+                'directory': str(self.directory),
+            }
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache(**kwargs) -> HttpCache:
+    """
+    Process-wide cache, created on first use and flushed at exit
+
+    kwargs are only applied when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(**kwargs)
+            atexit.register(_cache.flush, True)
+        return _cache
@@ -0,0 +1,212 @@
+"""
+Pooled HTTP Session
+Shared keep-alive connections for the static fetch tier
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    import httpx  # optional: only needed for HTTP/2
+except ImportError:
+    httpx = None
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _ConnectionCounter:
+    """Thread-safe counters for requests and new connections"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def bump(self, key: str, n: int = 1):
+        with self._lock:
+            self._counts[key] += n
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+def _counting_pool(base, counter: _ConnectionCounter, tls: bool):
+    """urllib3 pool class that records every new connection it opens"""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            counter.bump("connections_opened")
+            if tls:
+                counter.bump("tls_handshakes")
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, counter: _ConnectionCounter, **kwargs):
+        self._counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._counter, tls=False),
+            "https": _counting_pool(HTTPSConnectionPool, self._counter, tls=True),
+        }
+
+
+class HttpResponse:
+    """
+    The subset of a response the fetcher needs, for either backend
+
+    Always streamed: the body is only read through `text` or
+    `iter_bytes()`. Use as a context manager so the connection goes
+    back to the pool.
+    """
+
+    def __init__(self, raw, backend: str):
+        self._raw = raw
+        self.backend = backend
+        self.status_code = raw.status_code
+        self.headers = raw.headers
+        self.url = str(raw.url)
+
+    @property
+    def text(self) -> str:
+        if self.backend == "httpx":
+            self._raw.read()
+        return self._raw.text
+
+    def iter_bytes(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        if self.backend == "httpx":
+            return self._raw.iter_bytes(chunk_size)
+        return self._raw.iter_content(chunk_size)
+
+    def close(self):
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HttpSession:
+    """
+    Thread-safe HTTP client with per-host connection pools
+
+    Backed by one shared `requests.Session` (urllib3 pools are thread-safe)
+    with keep-alive and retry/backoff. With `http2=True` and httpx[http2]
+    installed, an httpx client is used instead; httpx only retries failed
+    connects, not error statuses.
+    """
+
+    def __init__(self, headers: Optional[Dict] = None, timeout: float = 15,
+                 pool_connections: int = 50, pool_maxsize: int = 10,
+                 retries: int = 2, backoff_factor: float = 0.5,
+                 http2: bool = False):
+        self.timeout = timeout
+        self._counter = _ConnectionCounter()
+
+        if http2 and httpx is None:
+            print("WARNING: HTTP/2 requested but httpx is not installed. Using HTTP/1.1.")
+            http2 = False
+
+        if http2:
+            self.backend = "httpx"
+            transport = httpx.HTTPTransport(
+                http2=True,
+                retries=retries,
+                limits=httpx.Limits(
+                    max_connections=pool_connections * pool_maxsize,
+                    max_keepalive_connections=pool_connections,
+                ),
+            )
+            self._client = httpx.Client(
+                transport=transport, headers=headers,
+                timeout=timeout, follow_redirects=True,
+            )
+        else:
+            self.backend = "requests"
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                respect_retry_after_header=False,  # never sleep minutes on a probe
+                raise_on_status=False,
+            )
+            adapter = _CountingAdapter(
+                self._counter,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=retry,
+            )
+            self._client = requests.Session()
+            self._client.mount("http://", adapter)
+            self._client.mount("https://", adapter)
+            if headers:
+                self._client.headers.update(headers)
+
+    def get(self, url: str, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> HttpResponse:
+        """Streamed GET; close the response (or use `with`) when done"""
+        timeout = timeout or self.timeout
+        self._counter.bump("requests")
+
+        if self.backend == "httpx":
+            request = self._client.build_request(
+                "GET", url, headers=headers, timeout=timeout,
+                extensions={"trace": self._trace},
+            )
+            raw = self._client.send(request, stream=True)
+        else:
+            raw = self._client.get(url, headers=headers, timeout=timeout, stream=True)
+        return HttpResponse(raw, self.backend)
+
+    def _trace(self, event_name: str, info: Dict):
+        if event_name == "connection.connect_tcp.complete":
+            self._counter.bump("connections_opened")
+        elif event_name == "connection.start_tls.complete":
+            self._counter.bump("tls_handshakes")
+
+    def stats(self) -> Dict:
+        """Request and connection counters since the session was created"""
+        stats = {
+            'requests': 0,
+            'connections_opened': 0,
+            'tls_handshakes': 0,
+            **self._counter.snapshot(),
+        }
+        stats['reused_connections'] = max(stats['requests'] - stats['connections_opened'], 0)
+        stats['backend'] = self.backend
+        return stats
+
+    def close(self):
+        self._client.close()
+
+
+_session: Optional[HttpSession] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session(**kwargs) -> HttpSession:
+    """
+    Process-wide session, created on first use
+
+    kwargs are only applied when the session is first created.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HttpSession(**kwargs)
+        return _session
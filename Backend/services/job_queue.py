@@ -0,0 +1,189 @@
+"""
+Persistent Job Queue
+Background workers for slow requests, with job state kept in a JSON file
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+class JobQueue:
+    """
+    Worker threads that run `handler(payload) -> (result, status_code)`
+
+    Layout (like the summaries database):
+        {
+            "jobs": {
+                "<job_id>": {
+                    "id": "...", "key": "example.com", "status": "queued|running|done|failed",
+                    "payload": {...}, "result": {...}, "status_code": 200, "error": null,
+                    "created_at": "...", "started_at": "...", "finished_at": "..."
+                }
+            }
+        }
+
+    Every state change is written to disk, so after a restart queued jobs
+    are picked up again and jobs that were running are re-queued.
+    Finished jobs are kept for `retention_hours` so clients can poll them.
+    """
+
+    def __init__(self, handler: Callable[[Dict], Tuple[Dict, int]],
+                 storage_file='jobs.json', workers: int = 4, retention_hours: float = 24):
+        self.handler = handler
+        self.storage_file = Path(storage_file)
+        self.retention_hours = retention_hours
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self.data = self._load()
+
+        # Resume whatever the last process didn't finish
+        resumed = 0
+        for job in sorted(self.data['jobs'].values(), key=lambda j: j['created_at']):
+            if job['status'] in ('queued', 'running'):
+                job['status'] = 'queued'
+                self._queue.put(job['id'])
+                resumed += 1
+        self._prune()
+        self._save()
+        if resumed:
+            print(f"📋 Resuming {resumed} queued job(s)")
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _load(self) -> Dict:
+        """Load data from JSON file"""
+        if self.storage_file.exists():
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {'jobs': {}}
+        return {'jobs': {}}
+
+    def _save(self):
+        """Write state atomically (callers hold the lock, or run before workers start)"""
+        tmp = self.storage_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.storage_file)
+
+    def _prune(self):
+        """Drop finished jobs past their retention"""
+        cutoff = time.time() - self.retention_hours * 3600
+        expired = [
+            job_id for job_id, job in self.data['jobs'].items()
+            if job['status'] in ('done', 'failed')
+            and datetime.fromisoformat(job['finished_at']).timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self.data['jobs'][job_id]
+
+    def submit(self, payload: Dict, key: Optional[str] = None) -> Dict:
+        """
+        Queue a job and return it
+
+        If a job with the same key is already queued or running, that job
+        is returned instead of queuing a duplicate.
+        """
+        with self._lock:
+            if key:
+                for job in self.data['jobs'].values():
+                    if job.get('key') == key and job['status'] in ('queued', 'running'):
+                        return dict(job)
+            job = {
+                'id': str(uuid.uuid4()),
+                'key': key,
+                'status': 'queued',
+                'payload': payload,
+                'result': None,
+                'status_code': None,
+                'error': None,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+            }
+            self.data['jobs'][job['id']] = job
+            self._prune()
+            self._save()
+        self._queue.put(job['id'])
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self.data['jobs'].get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        if job['status'] == 'queued':
+            job['queue_position'] = self._position(job_id)
+        return job
+
+    def _position(self, job_id: str) -> int:
+        with self._queue.mutex:
+            pending = list(self._queue.queue)
+        return pending.index(job_id) + 1 if job_id in pending else 0
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self.data['jobs'][job_id].update(fields)
+            self._save()
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self.data['jobs'].get(job_id)
+                payload = job['payload'] if job else None
+            if payload is None:
+                continue
+
+            self._update(job_id, status='running', started_at=datetime.now().isoformat())
+            try:
+                result, status_code = self.handler(payload)
+                self._update(job_id, status='done', result=result, status_code=status_code,
+                             finished_at=datetime.now().isoformat())
+            except Exception as e:
+                print(f"❌ Job {job_id} failed: {e}")
+                self._update(job_id, status='failed', error=str(e), status_code=500,
+                             finished_at=datetime.now().isoformat())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {}
+            for job in self.data['jobs'].values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'jobs': counts,
+            'queue_depth': self._queue.qsize(),
+            'workers': len(self._workers),
+            'storage_file': str(self.storage_file),
+        }
+
+
+_jobs: Optional[JobQueue] = None
+_jobs_lock = threading.Lock()
+
+
+def get_job_queue(**kwargs) -> JobQueue:
+    """
+    Process-wide queue, created (and its workers started) on first use
+
+    kwargs are only applied when the queue is first created.
+    """
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            _jobs = JobQueue(**kwargs)
+        return _jobs
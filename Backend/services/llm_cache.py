@@ -0,0 +1,193 @@
+"""
+LLM Response Cache
+Content-addressed store of model replies, so identical calls are answered locally
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace, so re-uploads that only differ in layout share a key"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_key(model: str, messages: List[Dict], params: Dict, version: str = "") -> str:
+    """
+    Cache key for one completion call
+
+    Hashes the model, the prompt version, the generation parameters and the
+    (whitespace-normalized) messages. The system prompt is part of the
+    messages, so editing it changes every key even without a version bump.
+    """
+    material = json.dumps({
+        'model': model,
+        'version': version,
+        'params': params,
+        'messages': [[m['role'], normalize_text(m['content'])] for m in messages],
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    Size-bounded LRU cache of reply text keyed by make_key()
+
+    Layout (JSON file, least recently used first):
+        {"<key>": {"content": "...", "created": 1700000000}}
+
+    Entries are kept in memory. Changes are buffered and `flush()` appends
+    them to `<storage_file>.log` at most every `flush_interval` seconds
+    unless forced, so a burst of calls costs one small write: a stored
+    reply is one compact JSON line with its entry, a lookup one line with
+    just its key (moving it to the most recently used end), an eviction
+    one line with a null entry. The log is replayed over the snapshot on
+    load, and folded back into it once it has more lines than the cache
+    has entries.
+    """
+
+    MIN_COMPACT_LINES = 1000
+
+    def __init__(self, storage_file='llm_cache.json', max_entries: int = 2000,
+                 flush_interval: float = 5):
+        self.storage_file = Path(storage_file)
+        self.log_file = Path(str(self.storage_file) + '.log')
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._dirty: "OrderedDict[str, bool]" = OrderedDict()  # key -> entry changed (not just used)
+        self._log_lines = 0
+        self._flushed_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[str, Dict]" = self._load()
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _load(self) -> "OrderedDict[str, Dict]":
+        """Load the snapshot, then replay the change log over it"""
+        entries = OrderedDict()
+        if self.storage_file.exists():
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    entries = OrderedDict(json.load(f))
+            except (OSError, ValueError):
+                entries = OrderedDict()
+        if self.log_file.exists():
+            try:
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            change = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line from an interrupted write
+                        self._log_lines += 1
+                        key = change['key']
+                        if 'entry' not in change:
+                            if key in entries:
+                                entries.move_to_end(key)
+                        elif change['entry'] is None:
+                            entries.pop(key, None)
+                        else:
+                            entries[key] = change['entry']
+                            entries.move_to_end(key)
+            except OSError:
+                pass
+        return entries
+
+    def flush(self, force: bool = False):
+        """Write pending changes to disk"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.time() - self._flushed_at < self.flush_interval:
+                return
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                for key, changed in self._dirty.items():
+                    change = {'key': key}
+                    if changed or key not in self.entries:
+                        change['entry'] = self.entries.get(key)
+                    f.write(json.dumps(change, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._log_lines += len(self._dirty)
+            self._dirty.clear()
+            if self._log_lines > max(len(self.entries), self.MIN_COMPACT_LINES):
+                self._compact()
+            self._flushed_at = time.time()
+
+    def _compact(self):
+        """Rewrite the snapshot from memory and empty the log (lock held)"""
+        tmp = self.storage_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.storage_file)
+        self.log_file.unlink(missing_ok=True)
+        self._log_lines = 0
+
+    def _mark(self, key: str, changed: bool):
+        """Queue a key for the next flush, in order of use (lock held)"""
+        self._dirty[key] = self._dirty.get(key, False) or changed
+        self._dirty.move_to_end(key)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self._mark(key, False)
+            self.hits += 1
+            return entry['content']
+
+    def set(self, key: str, content: str):
+        with self._lock:
+            self.entries[key] = {'content': content, 'created': time.time()}
+            self.entries.move_to_end(key)
+            self._mark(key, True)
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self._mark(evicted, True)
+        self.flush()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._dirty.clear()
+            self._compact()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache(**kwargs) -> LLMCache:
+    """
+    Process-wide cache, created on first use and flushed at exit
+
+    kwargs are only applied when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(**kwargs)
+            atexit.register(_cache.flush, True)
+        return _cache
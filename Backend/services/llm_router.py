@@ -0,0 +1,322 @@
+"""
+LLM Router
+Sends completions to the fastest healthy OpenAI-compatible endpoint, hedging slow ones
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from openai import OpenAI
+
+from services.chunker import estimate_tokens
+from services.rate_limiter import get_rate_limiter
+
+
+def reserved_tokens(messages: List[Dict], params: Dict) -> int:
+    """Token budget to reserve for a call: the prompt plus the most it may write"""
+    return sum(estimate_tokens(m['content']) for m in messages) + params.get('max_tokens', 0)
+
+
+class LLMEndpoint:
+    """
+    One endpoint: its client (with its own timeout), budget and track record
+
+    Latencies of recent successful calls give p50/p95; recent outcomes
+    give an error rate. After `failure_threshold` failures in a row the
+    endpoint cools down for `cooldown` seconds and is only tried last.
+    Retries and backoff come from the endpoint's RateLimiter.
+    """
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str = "",
+                 timeout: float = 60.0, window: int = 200, failure_threshold: int = 3,
+                 cooldown: float = 30.0, **limits):
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.client = OpenAI(api_key=api_key or "unused", base_url=base_url,
+                             timeout=timeout, max_retries=0)
+        self.limiter = get_rate_limiter(name, **limits)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._failures_in_row = 0
+        self._cooldown_until = 0.0
+        self._stats = {'calls': 0, 'errors': 0, 'hedges': 0, 'hedge_wins': 0}
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._cooldown_until
+
+    def expected_latency(self) -> float:
+        """Median latency inflated by the error rate"""
+        median = self.percentile(0.5)
+        if median is None:
+            # Untried endpoints go first so they get measured; ones that only ever failed go last
+            return float('inf') if self.error_rate else 0.0
+        return median / (1 - min(self.error_rate, 0.9))
+
+    def _record(self, ok: bool, latency: Optional[float] = None):
+        with self._lock:
+            self._stats['calls'] += 1
+            self._outcomes.append(ok)
+            if ok:
+                self._failures_in_row = 0
+                if latency is not None:
+                    self._latencies.append(latency)
+                return
+            self._stats['errors'] += 1
+            self._failures_in_row += 1
+            if self._failures_in_row >= self.failure_threshold:
+                self._cooldown_until = time.monotonic() + self.cooldown
+
+    def count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def complete(self, messages: List[Dict], **params):
+        """One chat completion (the raw response), recording its latency"""
+        tokens = reserved_tokens(messages, params)
+        started = time.monotonic()
+        try:
+            response = self.limiter.call(
+                lambda: self.client.chat.completions.create(model=self.model, messages=messages, **params),
+                tokens
+            )
+        except Exception:
+            self._record(False)
+            raise
+        self._record(True, time.monotonic() - started)
+        usage = getattr(response, 'usage', None)
+        if usage:
+            self.limiter.settle(tokens, usage.prompt_tokens + usage.completion_tokens)
+        return response
+
+    def open_stream(self, messages: List[Dict], **params):
+        """
+        A streaming completion; only its outcome is recorded (first-byte times aren't latencies)
+
+        The chunks are passed through a generator that settles the token
+        reservation once the stream is drained or closed.
+        """
+        tokens = reserved_tokens(messages, params)
+        try:
+            stream = self.limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model, messages=messages, stream=True, **params
+                ),
+                tokens
+            )
+        except Exception:
+            self._record(False)
+            raise
+        self._record(True)
+        return self._settled(stream, messages, tokens)
+
+    def _settled(self, stream, messages: List[Dict], tokens: int):
+        """
+        Yield the stream's chunks, then settle with what it used: the usage
+        a final chunk reports, or else an estimate from the text received
+        """
+        usage = None
+        text = []
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, 'usage', None) or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text.append(chunk.choices[0].delta.content)
+                yield chunk
+        finally:
+            if usage:
+                used = usage.prompt_tokens + usage.completion_tokens
+            else:
+                used = reserved_tokens(messages, {}) + estimate_tokens("".join(text))
+            self.limiter.settle(tokens, used)
+            close = getattr(stream, 'close', None)
+            if close:
+                close()  # an abandoned stream releases its connection
+
+    def stats(self) -> Dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        with self._lock:
+            return dict(
+                self._stats,
+                model=self.model,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                p50_ms=None if p50 is None else round(p50 * 1000),
+                p95_ms=None if p95 is None else round(p95 * 1000),
+                samples=len(self._latencies),
+                error_rate=round(self._outcomes.count(False) / len(self._outcomes), 3) if self._outcomes else 0.0,
+                cooling_down=max(self._cooldown_until - time.monotonic(), 0) > 0,
+            )
+
+
+class LLMRouter:
+    """
+    Routes each completion to the endpoint expected to answer first
+
+    Endpoints are ranked by expected latency; cooling-down ones go last.
+    If the first endpoint hasn't answered by its p95 latency (once it has
+    `min_samples` of them), a hedged duplicate goes to the next endpoint
+    (or the same one, if it is the only one) and whichever answers first
+    is used. An endpoint that fails hands over to the next one straight
+    away. The losing request is left to finish in the background.
+    """
+
+    def __init__(self, endpoints: List[LLMEndpoint], hedge: bool = True,
+                 hedge_percentile: float = 0.95, min_samples: int = 20, max_workers: int = 16):
+        if not endpoints:
+            raise ValueError("LLMRouter needs at least one endpoint")
+        self.endpoints = endpoints
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    @property
+    def models(self) -> str:
+        """
+        Every endpoint and model a reply may come from (part of the LLM cache key)
+
+        The same model name served by another provider is a different model.
+        """
+        return "|".join(sorted({f"{e.base_url} {e.model}" for e in self.endpoints}))
+
+    def ranked(self) -> List[LLMEndpoint]:
+        return sorted(self.endpoints, key=lambda e: (not e.available, e.expected_latency()))
+
+    def hedge_delay(self, endpoint: LLMEndpoint) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there's too little data"""
+        if not self.hedge or endpoint.samples < self.min_samples:
+            return None
+        return endpoint.percentile(self.hedge_percentile)
+
+    def complete(self, messages: List[Dict], **params):
+        """
+        The first successful response among the primary and its hedge
+
+        Raises the last endpoint's error if every endpoint fails.
+        """
+        candidates = self.ranked()
+        primary = candidates[0]
+        hedge_targets = candidates[1:] or ([primary] if self.hedge else [])
+        failover = list(candidates[1:])
+        pending = {}
+        hedged = False
+        last_error = None
+        started = time.monotonic()
+
+        def launch(endpoint, is_hedge=False):
+            if is_hedge:
+                endpoint.count('hedges')
+            pending[self._pool.submit(endpoint.complete, messages, **params)] = (endpoint, is_hedge)
+
+        launch(primary)
+        while pending:
+            timeout = None
+            delay = self.hedge_delay(primary)
+            if not hedged and hedge_targets and delay is not None:
+                timeout = max(delay - (time.monotonic() - started), 0)
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                target = hedge_targets[0]
+                if target in failover:
+                    failover.remove(target)
+                print(f"[llm] {primary.name} slower than p95 ({delay:.1f}s); hedging to {target.name}")
+                launch(target, is_hedge=True)
+                continue
+
+            for future in done:
+                endpoint, is_hedge = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    print(f"[llm] {endpoint.name} failed: {e}")
+                    continue
+                if is_hedge:
+                    endpoint.count('hedge_wins')
+                return response
+
+            if not pending and failover:
+                hedged = True  # a failover request is not hedged again
+                launch(failover.pop(0))
+
+        raise last_error
+
+    def stream(self, messages: List[Dict], **params):
+        """A streaming completion from the best endpoint that accepts it (not hedged)"""
+        last_error = None
+        for endpoint in self.ranked():
+            try:
+                return endpoint.open_stream(messages, **params)
+            except Exception as e:
+                last_error = e
+                print(f"[llm] {endpoint.name} stream failed: {e}")
+        raise last_error
+
+    def stats(self) -> Dict:
+        return {endpoint.name: endpoint.stats() for endpoint in self.endpoints}
+
+
+def load_endpoints(spec: str, default: Dict, **defaults) -> List[LLMEndpoint]:
+    """
+    Endpoints from LLM_ENDPOINTS, or just `default` when it is unset
+
+    spec is a JSON list of {name, base_url, model, api_key | api_key_env,
+    timeout, requests_per_minute, ...}; `defaults` fill in missing keys.
+    """
+    entries = json.loads(spec) if spec and spec.strip() else [default]
+    endpoints = []
+    for entry in entries:
+        entry = dict(defaults, **entry)
+        api_key_env = entry.pop('api_key_env', None)
+        if api_key_env:
+            entry['api_key'] = os.environ.get(api_key_env, "")
+        entry.setdefault('name', entry['base_url'])
+        endpoints.append(LLMEndpoint(**entry))
+    return endpoints
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router(endpoints: List[LLMEndpoint] = None, **kwargs) -> LLMRouter:
+    """
+    Process-wide router, created on first use
+
+    Arguments are only applied when the router is first created.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter(endpoints, **kwargs)
+        return _router
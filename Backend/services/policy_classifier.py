@@ -0,0 +1,71 @@
+"""
+Policy Page Classifier
+One pass over a page's text scores it for every policy type and bot page
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+
+BOT = "_bot"  # pseudo-type for BOT_PHRASES
+
+
+@dataclass
+class Classification:
+    """Result of scanning one page"""
+    scores: Dict[str, int]                     # policy_type -> weighted match count
+    bot_page: bool
+    positions: List[Tuple[int, int, str]] = field(default_factory=list)  # (start, end, phrase), if kept
+
+    def score(self, policy_type: str) -> int:
+        return self.scores.get(policy_type, 0)
+
+    def matches_type(self, policy_type: str) -> bool:
+        return self.score(policy_type) > 0
+
+
+class PolicyClassifier:
+    """
+    Multi-pattern matcher over all keyword and bot phrases
+
+    Every phrase goes into one case-insensitive alternation, longest first,
+    so a single regex scan (C speed, no per-phrase passes) finds
+    leftmost-longest, non-overlapping matches: "privacy policy" counts once
+    rather than also as "privacy". This is the standard-library stand-in
+    for an Aho-Corasick automaton.
+
+    A phrase scores one point per word, so specific phrases ("terms of
+    service") outweigh generic ones ("terms"). Match positions are only
+    collected with `keep_positions=True`; scoring doesn't need them.
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]], bot_phrases: Iterable[str]):
+        self.types = list(keywords)
+        self._owners: Dict[str, List[str]] = {}
+        for policy_type, phrases in keywords.items():
+            for phrase in phrases:
+                self._owners.setdefault(phrase.lower(), []).append(policy_type)
+        for phrase in bot_phrases:
+            self._owners.setdefault(phrase.lower(), []).append(BOT)
+
+        alternation = "|".join(
+            re.escape(p) for p in sorted(self._owners, key=len, reverse=True)
+        )
+        self._pattern = re.compile(alternation, re.IGNORECASE)
+
+    def classify(self, text: str, keep_positions: bool = False) -> Classification:
+        scores = {policy_type: 0 for policy_type in self.types}
+        bot_page = False
+        positions = []
+        for m in self._pattern.finditer(text or ""):
+            phrase = m.group(0).lower()
+            weight = len(phrase.split())
+            for owner in self._owners.get(phrase, ()):
+                if owner == BOT:
+                    bot_page = True
+                else:
+                    scores[owner] += weight
+            if keep_positions:
+                positions.append((m.start(), m.end(), phrase))
+        return Classification(scores=scores, bot_page=bot_page, positions=positions)
@@ -0,0 +1,77 @@
+"""
+Bulk Policy Store
+Append-only, gzip-compressed JSON Lines file for crawl results
+"""
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator
+
+
+class PolicyStore:
+    """
+    One JSON record per site, appended as its own gzip member
+
+    Concatenated gzip members are still a valid .gz file, so the store
+    can be read with `zcat`/`gzip.open` while a crawl is appending to it.
+    Every append is flushed, and `size` after an append is a safe point
+    to `truncate()` back to when resuming after a crash.
+    """
+
+    def __init__(self, path='policies.jsonl.gz', compresslevel: int = 6):
+        self.path = Path(path)
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._file.tell()
+
+    def truncate(self, size: int):
+        """Drop anything written after `size` bytes (a half-written record)"""
+        with self._lock:
+            if self._file.tell() > size:
+                self._file.truncate(size)
+                self._file.seek(size)
+
+    def append(self, record: Dict) -> int:
+        """Write one record; returns the store size afterwards"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        member = gzip.compress(line.encode('utf-8'), compresslevel=self.compresslevel)
+        with self._lock:
+            self._file.write(member)
+            self._file.flush()
+            return self._file.tell()
+
+    def sync(self):
+        """Flush to disk (os.fsync); called before a checkpoint records `size`"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def iter_records(path) -> Iterator[Dict]:
+    """
+    Read every complete record from a store
+
+    A truncated final member (the process was killed mid-write) ends the
+    iteration instead of raising.
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    except (EOFError, ValueError, zlib.error, gzip.BadGzipFile):
+        return
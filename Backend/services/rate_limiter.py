@@ -0,0 +1,214 @@
+"""
+LLM Rate Limiting
+Client-side request and token budgets per provider, with backoff and typed errors
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import openai  # classifies the client's connection errors; status codes work without it
+except ImportError:
+    openai = None
+
+
+class LLMError(Exception):
+    """An LLM call that failed in a way worth retrying later"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMError):
+    """Over the provider's rate limit (or our own budget) after retries"""
+
+
+class LLMUnavailableError(LLMError):
+    """Provider unreachable, timing out or failing after retries"""
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds from a Retry-After header (HTTP dates are ignored)"""
+    try:
+        return max(float(response.headers.get('retry-after')), 0)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def classify_error(error: BaseException) -> Tuple[Optional[str], Optional[float]]:
+    """
+    ('rate_limited' | 'unavailable' | None, Retry-After seconds or None)
+
+    None means the call itself is at fault (bad request, auth) and
+    retrying it won't help.
+    """
+    status = getattr(error, 'status_code', None)
+    retry_after = _retry_after(getattr(error, 'response', None))
+    if status == 429:
+        return 'rate_limited', retry_after
+    if status in (408, 409) or (status is not None and status >= 500):
+        return 'unavailable', retry_after
+    transient = (ConnectionError, TimeoutError)
+    if openai is not None:
+        transient += (openai.APIConnectionError,)  # includes APITimeoutError
+    if isinstance(error, transient):
+        return 'unavailable', None
+    return None, None
+
+
+class TokenBucket:
+    """
+    `per_minute` units, refilled continuously; 0 means unlimited
+
+    The level may go negative when a call uses more than was reserved,
+    which delays the next callers instead of being forgotten.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (large requests only need a full bucket)"""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0) * 60 / self.capacity
+
+    def take(self, amount: float):
+        if self.capacity:
+            self.level -= amount
+
+
+class RateLimiter:
+    """
+    Budget for one provider
+
+    `call(fn, tokens)` waits for a request slot and `tokens` of token
+    budget, then runs fn. 429s and transient failures (5xx, timeouts,
+    connection errors) are retried with jittered exponential backoff,
+    honouring Retry-After. A 429 pauses every caller of this provider,
+    not just the one that hit it. When retries run out, or the budget
+    would take longer than `max_wait` to free up, LLMRateLimitError or
+    LLMUnavailableError is raised with a `retry_after` hint.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 50, tokens_per_minute: float = 0,
+                 max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 max_wait: float = 30.0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._stats = {'calls': 0, 'tokens': 0, 'throttled': 0, 'retries': 0,
+                       'rate_limited': 0, 'unavailable': 0, 'rejected': 0}
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential delay with jitter, so retrying callers don't move in lockstep"""
+        cap = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (the provider told us to back off)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, tokens: float = 0):
+        """Block until the budget allows one request of `tokens`"""
+        deadline = time.monotonic() + self.max_wait
+        throttled = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now),
+                           self._paused_until - now)
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    self._stats['calls'] += 1
+                    self._stats['tokens'] += tokens
+                    return
+                if now + wait > deadline:
+                    self._stats['rejected'] += 1
+                    raise LLMRateLimitError(f"{self.name}: request budget exhausted", retry_after=wait)
+                if not throttled:
+                    throttled = True
+                    self._stats['throttled'] += 1
+            time.sleep(min(wait, 1.0))
+
+    def settle(self, reserved: float, used: float):
+        """Correct the token budget once a call reports what it actually used"""
+        with self._lock:
+            self.tokens.take(used - reserved)
+            self._stats['tokens'] += used - reserved
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                return fn()
+            except Exception as e:
+                kind, retry_after = classify_error(e)
+                if kind is None:
+                    raise
+                # The failed attempt didn't use its tokens
+                self.settle(tokens, 0)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                with self._lock:
+                    self._stats[kind] += 1
+                if kind == 'rate_limited':
+                    self.pause(delay)
+                if attempt == self.max_retries:
+                    error = LLMRateLimitError if kind == 'rate_limited' else LLMUnavailableError
+                    raise error(f"{self.name}: {e}", retry_after=delay) from e
+                with self._lock:
+                    self._stats['retries'] += 1
+                print(f"[rate-limit] {self.name} {kind} ({e}); retry {attempt + 1} in {delay:.1f}s")
+                if kind != 'rate_limited':
+                    time.sleep(delay)  # a 429 already paused acquire()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            return dict(
+                self._stats,
+                requests_per_minute=self.requests.capacity,
+                tokens_per_minute=self.tokens.capacity,
+                paused_for=round(max(self._paused_until - now, 0), 1),
+            )
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, **kwargs) -> RateLimiter:
+    """
+    Process-wide limiter for a provider, created on first use
+
+    kwargs are only applied when that provider's limiter is first created.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(provider, **kwargs)
+        return _limiters[provider]
+
+
+def rate_limiter_stats() -> Dict:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,177 @@
+"""
+Refresh-Ahead Scheduler
+Re-summarizes the most requested cache entries before they expire, within an hourly token budget
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class RefreshAheadScheduler:
+    """
+    Background thread that keeps popular summaries from ever expiring
+
+    Every `interval` seconds it takes the `top_n` most-hit summaries from
+    `popular(top_n)`, keeps those that expire within `lead_days` and were
+    hit within `active_days`, and refreshes them most-hit first with
+    `refresh(summary) -> (body, status, tokens_used)`. Refreshes run one at
+    a time, so they never take more than one summary slot from user requests.
+
+    The budget is `tokens_per_hour` over a sliding hour. A refresh only
+    starts if `tokens_per_refresh` still fits, and is then charged what its
+    LLM calls actually used: nothing when the policy text was unchanged,
+    several times the estimate for a long policy that was condensed in
+    chunks. An overrun holds back later refreshes until it leaves the window.
+    """
+
+    def __init__(self, popular: Callable[[int], List[Dict]],
+                 refresh: Callable[[Dict], Tuple[Dict, int]],
+                 expiry_days: float, lead_days: float = 2, active_days: Optional[float] = None,
+                 top_n: int = 50, tokens_per_hour: int = 100000,
+                 tokens_per_refresh: int = 20000, interval: float = 600):
+        self.popular = popular
+        self.refresh = refresh
+        self.expiry_days = expiry_days
+        self.lead_days = lead_days
+        self.active_days = active_days if active_days is not None else expiry_days
+        self.top_n = top_n
+        self.tokens_per_hour = tokens_per_hour
+        self.tokens_per_refresh = tokens_per_refresh
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._spent = deque()  # [time, tokens] within the last hour
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'runs': 0, 'refreshed': 0, 'unchanged': 0, 'failed': 0,
+                       'skipped_budget': 0, 'tokens_used': 0, 'last_run': None}
+
+    # -----------------------------------------------------
+    # Budget
+    # -----------------------------------------------------
+
+    def spent(self) -> int:
+        """Tokens used (or reserved, for a refresh in progress) in the last hour"""
+        cutoff = time.time() - 3600
+        with self._lock:
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            return sum(tokens for _, tokens in self._spent)
+
+    def _reserve(self) -> Optional[List]:
+        """Hold `tokens_per_refresh` for a refresh about to start, or None if it doesn't fit"""
+        if self.spent() + self.tokens_per_refresh > self.tokens_per_hour:
+            return None
+        entry = [time.time(), self.tokens_per_refresh]
+        with self._lock:
+            self._spent.append(entry)
+        return entry
+
+    def _settle(self, entry: List, used: int):
+        """Replace a reservation with what the refresh actually used"""
+        with self._lock:
+            entry[1] = used
+            self._stats['tokens_used'] += used
+
+    # -----------------------------------------------------
+    # Selection
+    # -----------------------------------------------------
+
+    @staticmethod
+    def _age_days(timestamp: Optional[str]) -> Optional[float]:
+        try:
+            return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds() / 86400
+        except (TypeError, ValueError):
+            return None
+
+    def due(self, summary: Dict) -> bool:
+        """Expires within lead_days, and still being requested"""
+        age = self._age_days(summary.get('timestamp'))
+        if age is None or age < self.expiry_days - self.lead_days:
+            return False
+        last_hit = self._age_days(summary.get('last_hit'))
+        return last_hit is not None and last_hit <= self.active_days
+
+    # -----------------------------------------------------
+    # Running
+    # -----------------------------------------------------
+
+    def run_once(self) -> int:
+        """Refresh whatever is due and affordable now; returns how many were attempted"""
+        candidates = [s for s in self.popular(self.top_n) if self.due(s)]
+        refreshed = 0
+        for summary in candidates:
+            if self._stop.is_set():
+                break
+            reservation = self._reserve()
+            if reservation is None:
+                with self._lock:
+                    self._stats['skipped_budget'] += len(candidates) - refreshed
+                print(f"[refresh-ahead] hourly token budget used; {len(candidates) - refreshed} left for later")
+                break
+            try:
+                body, status, used = self.refresh(summary)
+            except Exception as e:
+                # Whatever it spent before failing is unknown; keep the reservation
+                body, status, used = {"error": str(e)}, 500, self.tokens_per_refresh
+            self._settle(reservation, used)
+            with self._lock:
+                if status != 200:
+                    self._stats['failed'] += 1
+                elif body.get('unchanged'):
+                    self._stats['unchanged'] += 1
+                else:
+                    self._stats['refreshed'] += 1
+            print(f"[refresh-ahead] {summary['url']} ({summary.get('hit_count', 0)} hits): "
+                  f"{'unchanged' if body.get('unchanged') else status}, {used} tokens")
+            refreshed += 1
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['last_run'] = datetime.now().isoformat()
+        return refreshed
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[refresh-ahead] run failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="refresh-ahead", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        spent = self.spent()
+        with self._lock:
+            return dict(
+                self._stats,
+                tokens_last_hour=spent,
+                tokens_per_hour=self.tokens_per_hour,
+                top_n=self.top_n,
+                lead_days=self.lead_days,
+            )
+
+
+_scheduler: Optional[RefreshAheadScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_refresh_ahead(**kwargs) -> RefreshAheadScheduler:
+    """
+    Process-wide scheduler, created and started on first use
+
+    kwargs are only applied when the scheduler is first created.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshAheadScheduler(**kwargs)
+            _scheduler.start()
+        return _scheduler
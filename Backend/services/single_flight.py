@@ -0,0 +1,152 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one execution
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl  # POSIX only; cross-process locking is skipped without it
+except ImportError:
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-process coalescing
+
+    The first caller for a key runs `fn`; callers arriving while it runs
+    wait and receive the same result (or exception). Nothing is cached
+    afterwards: the next call after completion runs `fn` again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None,
+           recheck: Optional[Callable[[], Any]] = None) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared): shared is True for callers that waited
+
+        A waiter that gives up after `timeout` seconds runs `fn` itself.
+        `recheck` is only used by the cross-process variant.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            if call.done.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            print(f"[single-flight] gave up waiting on {key}; running it here")
+            return fn(), False
+
+        try:
+            call.result = self._run(key, fn, timeout, recheck)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run(self, key, fn, timeout, recheck):
+        return fn()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'waiting': sum(c.waiters for c in self._calls.values()),
+            }
+
+
+class FileLockSingleFlight(SingleFlight):
+    """
+    Coalescing across worker processes (gunicorn -w N) via lock files
+
+    Within a process, callers coalesce as in SingleFlight. The leader then
+    takes an exclusive flock on <lock_dir>/<key hash>.lock, so only one
+    process works on a key at a time. Results can't be handed across
+    processes, so once the lock is held `recheck()` is called: if another
+    process has finished the work (e.g. saved it to the database), its
+    non-None return value is used instead of running `fn`.
+    """
+
+    def __init__(self, lock_dir: str, poll_interval: float = 0.1):
+        super().__init__()
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+
+    def _lock_path(self, key: str) -> Path:
+        return self.lock_dir / (hashlib.sha256(key.encode()).hexdigest()[:32] + '.lock')
+
+    def _run(self, key, fn, timeout, recheck):
+        fd = os.open(self._lock_path(key), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            deadline = None if timeout is None else time.time() + timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is not None and time.time() > deadline:
+                        print(f"[single-flight] lock on {key} still held; running it here")
+                        return fn()
+                    time.sleep(self.poll_interval)
+
+            try:
+                # Another process may have finished just before we got the lock
+                if recheck is not None:
+                    result = recheck()
+                    if result is not None:
+                        return result
+                return fn()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+_flight: Optional[SingleFlight] = None
+_flight_lock = threading.Lock()
+
+
+def get_single_flight(lock_dir: Optional[str] = None) -> SingleFlight:
+    """
+    Process-wide instance, created on first use
+
+    With lock_dir (and fcntl available) coalescing also spans processes.
+    """
+    global _flight
+    with _flight_lock:
+        if _flight is None:
+            if lock_dir and fcntl is None:
+                print("WARNING: Cross-process single-flight needs fcntl (POSIX). Using in-process only.")
+                lock_dir = None
+            _flight = FileLockSingleFlight(lock_dir) if lock_dir else SingleFlight()
+        return _flight
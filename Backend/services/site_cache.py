@@ -0,0 +1,236 @@
+"""
+Per-Site Fetch Memory
+Remembers which policy URLs are dead and which worked, per origin,
+and where each origin redirects to
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+# How long a failed probe is remembered, by failure reason (hours)
+DEAD_TTL_HOURS = {
+    'http_404': 7 * 24,
+    'http_410': 30 * 24,
+    'not_html': 7 * 24,
+    'no_keywords': 3 * 24,
+    'bot_page': 24,
+    'thin_content': 24,
+    'spa_shell': 24,
+    'render_failed': 24,
+    'too_large': 24,
+}
+DEFAULT_DEAD_TTL_HOURS = 1  # network errors, 5xx, anything transient
+
+
+class SiteCache:
+    """
+    JSON-backed negative/positive cache keyed by origin
+
+    Layout:
+        {
+            "https://example.com": {
+                "dead": {"/privacy-policy": {"reason": "http_404", "policy_type": null,
+                                             "expires": 1700000000}},
+                "working": {"privacy": {"url": "https://example.com/privacy", "updated": 1690000000}},
+                "canonical": {"origin": "https://www.example.com", "expires": 1700000000}
+            }
+        }
+
+    Updates are kept in memory and written by `flush()`, so a lookup that
+    records dozens of failures costs one write. With `flush_interval` set
+    (bulk crawls), `flush()` writes at most that often unless forced.
+
+    A flush appends only the origins that changed to `<storage_file>.log`
+    (one compact JSON line each, replayed over the snapshot on load). The
+    snapshot is rewritten, and the log emptied, once the log holds more
+    lines than there are origins, so a 50k-domain crawl doesn't
+    re-serialize the whole file at every checkpoint.
+    """
+
+    MIN_COMPACT_LINES = 1000
+
+    def __init__(self, storage_file='site_cache.json', ttl_scale: float = 1.0,
+                 flush_interval: float = 0):
+        self.storage_file = Path(storage_file)
+        self.ttl_scale = ttl_scale
+        self.flush_interval = flush_interval
+        self.log_file = Path(str(self.storage_file) + '.log')
+        self._lock = threading.Lock()
+        self._dirty = set()  # origins changed since the last flush
+        self._log_lines = 0
+        self._flushed_at = 0.0
+        self.data = self._load()
+
+    def _load(self) -> Dict:
+        """Load the snapshot, then replay the change log over it"""
+        data = {}
+        if self.storage_file.exists():
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        if self.log_file.exists():
+            try:
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            change = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line from an interrupted write
+                        self._log_lines += 1
+                        if change['site'] is None:
+                            data.pop(change['origin'], None)
+                        else:
+                            data[change['origin']] = change['site']
+            except OSError:
+                pass
+        return data
+
+    def flush(self, force: bool = False):
+        """Write pending changes to disk"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.time() - self._flushed_at < self.flush_interval:
+                return
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                for origin in self._dirty:
+                    change = {'origin': origin, 'site': self.data.get(origin)}
+                    f.write(json.dumps(change, separators=(',', ':')) + '\n')
+            self._log_lines += len(self._dirty)
+            self._dirty.clear()
+            if self._log_lines > max(len(self.data), self.MIN_COMPACT_LINES):
+                self._compact()
+            self._flushed_at = time.time()
+
+    def _compact(self):
+        """Rewrite the snapshot from memory and empty the log (lock held)"""
+        tmp = self.storage_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, separators=(',', ':'))
+        os.replace(tmp, self.storage_file)
+        self.log_file.unlink(missing_ok=True)
+        self._log_lines = 0
+
+    @staticmethod
+    def _split(url: str):
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        return f"{parsed.scheme}://{parsed.netloc}", path
+
+    def _site(self, origin: str) -> Dict:
+        return self.data.setdefault(origin, {'dead': {}, 'working': {}})
+
+    # -----------------------------------------------------
+    # Negative entries
+    # -----------------------------------------------------
+
+    def is_dead(self, url: str, policy_type: Optional[str] = None) -> bool:
+        """
+        True if a recent probe of this URL failed
+
+        Entries recorded for one policy type only (a page that loaded but
+        lacked that type's keywords) do not block other types.
+        """
+        origin, path = self._split(url)
+        with self._lock:
+            entry = self.data.get(origin, {}).get('dead', {}).get(path)
+            if not entry:
+                return False
+            if entry['expires'] < time.time():
+                del self.data[origin]['dead'][path]
+                self._dirty.add(origin)
+                return False
+            return entry.get('policy_type') in (None, policy_type)
+
+    def mark_dead(self, url: str, reason: str, policy_type: Optional[str] = None):
+        hours = DEAD_TTL_HOURS.get(reason, DEFAULT_DEAD_TTL_HOURS) * self.ttl_scale
+        origin, path = self._split(url)
+        with self._lock:
+            self._site(origin)['dead'][path] = {
+                'reason': reason,
+                'policy_type': policy_type,
+                'expires': time.time() + hours * 3600,
+            }
+            self._dirty.add(origin)
+
+    # -----------------------------------------------------
+    # Positive entries
+    # -----------------------------------------------------
+
+    def get_working(self, origin: str) -> Dict[str, str]:
+        """{policy_type: url} that worked last time for this origin"""
+        with self._lock:
+            working = self.data.get(origin, {}).get('working', {})
+            return {policy_type: entry['url'] for policy_type, entry in working.items()}
+
+    def mark_working(self, origin: str, policy_type: str, url: str):
+        with self._lock:
+            site = self._site(origin)
+            site['working'][policy_type] = {'url': url, 'updated': time.time()}
+            # A path that works is not dead, whatever we thought before
+            url_origin, path = self._split(url)
+            if self.data.get(url_origin, {}).get('dead', {}).pop(path, None):
+                self._dirty.add(url_origin)
+            self._dirty.add(origin)
+
+    def forget_working(self, origin: str, policy_type: str):
+        with self._lock:
+            if self.data.get(origin, {}).get('working', {}).pop(policy_type, None):
+                self._dirty.add(origin)
+
+    # -----------------------------------------------------
+    # Canonical origins
+    # -----------------------------------------------------
+
+    def get_canonical(self, origin: str) -> Optional[str]:
+        """Origin this one redirects to (itself if it doesn't), or None if unknown/expired"""
+        with self._lock:
+            entry = self.data.get(origin, {}).get('canonical')
+            if not entry or entry['expires'] < time.time():
+                return None
+            return entry['origin']
+
+    def set_canonical(self, origin: str, canonical: str, ttl_hours: float):
+        with self._lock:
+            self._site(origin)['canonical'] = {
+                'origin': canonical,
+                'expires': time.time() + ttl_hours * 3600,
+            }
+            self._dirty.add(origin)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'origins': len(self.data),
+                'canonical_origins': sum(1 for s in self.data.values() if 'canonical' in s),
+                'dead_paths': sum(len(s.get('dead', {})) for s in self.data.values()),
+                'working_paths': sum(len(s.get('working', {})) for s in self.data.values()),
+                'storage_file': str(self.storage_file),
+            }
+
+
+_cache: Optional[SiteCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_site_cache(**kwargs) -> SiteCache:
+    """
+    Process-wide cache, created on first use
+
+    kwargs are only applied when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SiteCache(**kwargs)
+        return _cache
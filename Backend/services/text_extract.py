@@ -0,0 +1,111 @@
+"""
+HTML-to-Text Extraction
+Pluggable backends for turning policy HTML into plain text
+"""
+
+import importlib
+import re
+from typing import Callable, Dict
+
+from bs4 import BeautifulSoup
+
+
+# Never part of the readable text
+DROP_TAGS = ["script", "style", "noscript", "iframe", "template"]
+
+# Site chrome; header/footer are kept inside <main>/<article>,
+# where they usually hold the policy's own title and dates
+BOILERPLATE_TAGS = ["nav", "header", "footer"]
+CONTENT_CONTAINERS = ("main", "article")
+
+_WHITESPACE = re.compile(r"\s{2,}")
+
+
+def _finish(strings) -> str:
+    """Join stripped text nodes the way BeautifulSoup.get_text(" ", strip=True) does"""
+    text = " ".join(s for s in (s.strip() for s in strings) if s)
+    return _WHITESPACE.sub(" ", text)
+
+
+# =========================================================
+# BACKENDS
+# =========================================================
+
+def extract_bs4(html: str) -> str:
+    """Pure-Python reference implementation (html.parser)"""
+    soup = BeautifulSoup(html or "", "html.parser")
+    for tag in soup(DROP_TAGS + ["nav"]):
+        tag.decompose()
+    for tag in soup(["header", "footer"]):
+        if not tag.find_parent(CONTENT_CONTAINERS):
+            tag.decompose()
+    return _finish(soup.stripped_strings)
+
+
+def extract_lxml(html: str) -> str:
+    """libxml2 parser; an order of magnitude faster than html.parser"""
+    import lxml.html
+    from lxml import etree
+
+    if not html or not html.strip():
+        return ""
+    try:
+        root = lxml.html.fromstring(html)
+    except ValueError:
+        # str input with an <?xml encoding=...?> declaration
+        root = lxml.html.fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return ""
+
+    etree.strip_elements(root, etree.Comment, *DROP_TAGS, "nav", with_tail=False)
+    containers = " or ".join(f"ancestor::{tag}" for tag in CONTENT_CONTAINERS)
+    for node in root.xpath(f"//header[not({containers})] | //footer[not({containers})]"):
+        node.drop_tree()  # keeps the tail text, like decompose()
+    return _finish(root.itertext())
+
+
+def extract_selectolax(html: str) -> str:
+    """lexbor C parser via selectolax; fastest, lowest memory"""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html or "")
+    tree.strip_tags(DROP_TAGS + ["nav"])
+    for node in tree.css("header, footer"):
+        parent = node.parent
+        while parent is not None and parent.tag not in CONTENT_CONTAINERS:
+            parent = parent.parent
+        if parent is None:
+            node.decompose()
+    if tree.root is None:
+        return ""
+    return _WHITESPACE.sub(" ", tree.root.text(separator=" ", strip=True))
+
+
+BACKENDS: Dict[str, Callable[[str], str]] = {
+    "bs4": extract_bs4,
+    "lxml": extract_lxml,
+    "selectolax": extract_selectolax,
+}
+
+_OPTIONAL_MODULES = {"lxml": "lxml", "selectolax": "selectolax.lexbor"}
+
+
+def get_extractor(name: str) -> Callable[[str], str]:
+    """
+    Extractor function for a backend name
+
+    Falls back to bs4 (with a warning) when the backend's package is not
+    installed, so a config typo or missing wheel never breaks fetching.
+    """
+    name = (name or "bs4").lower()
+    if name not in BACKENDS:
+        print(f"WARNING: Unknown TEXT_EXTRACTOR '{name}'. Using bs4.")
+        return extract_bs4
+    module = _OPTIONAL_MODULES.get(name)
+    if module:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            print(f"WARNING: TEXT_EXTRACTOR={name} but {module} is not installed. Using bs4.")
+            return extract_bs4
+    return BACKENDS[name]
@@ -0,0 +1,22 @@
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from services.browser_pool import BrowserPool
+
+
+def test_timed_out_job_never_runs():
+    pool = BrowserPool(size=1)
+    # No worker threads, so the job is still queued when the timeout hits
+    pool.start = lambda: None
+    pool._slots = [{'dead': False}]
+    ran = []
+
+    with pytest.raises(TimeoutError):
+        pool.run(lambda page: ran.append(page), timeout=0.05)
+
+    # What a worker does when it dequeues the job
+    fn, future = pool._jobs.get_nowait()
+    assert future.cancelled()
+    assert not future.set_running_or_notify_cancel()
+    assert ran == []
@@ -0,0 +1,61 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import policy_fetcher_safe as fetcher
+from services.policy_store import iter_records
+
+BACKEND = Path(__file__).resolve().parent.parent
+DOMAINS = [f"site{i}.test" for i in range(40)]
+
+# A crawl whose sites take a while, checkpointing far too rarely to reach a checkpoint
+SLOW_CRAWL = textwrap.dedent("""
+    import sys, time
+    import policy_fetcher_safe as fetcher
+
+    def crawl_site(domain):
+        time.sleep(0.05)
+        return {'domain': domain, 'status': 'ok', 'found_types': ['privacy'],
+                'policies': {'privacy': 'text'}}
+
+    fetcher.crawl_site = crawl_site
+    fetcher.BULK_CHECKPOINT_SECONDS = 3600
+    fetcher.bulk_crawl(sys.argv[1], sys.argv[2], workers=2)
+""")
+
+
+def fake_crawl_site(domain):
+    return {'domain': domain, 'status': 'ok', 'found_types': ['privacy'],
+            'policies': {'privacy': 'text'}}
+
+
+def test_killed_before_first_checkpoint_resumes(tmp_path, monkeypatch):
+    domains_file = tmp_path / "domains.txt"
+    domains_file.write_text("\n".join(DOMAINS))
+    out = tmp_path / "policies.jsonl.gz"
+
+    env = dict(os.environ, SITE_CACHE_ENABLED="false", HTTP_CACHE_ENABLED="false")
+    proc = subprocess.Popen([sys.executable, "-c", SLOW_CRAWL, str(domains_file), str(out)],
+                            cwd=BACKEND, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline and not (out.exists() and out.stat().st_size):
+            time.sleep(0.05)
+        assert out.stat().st_size, "crawl never appended a record"
+    finally:
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+
+    # Resume in-process with the same --out: no SystemExit, every domain exactly once
+    monkeypatch.setattr(fetcher, "crawl_site", fake_crawl_site)
+    monkeypatch.setattr(fetcher, "site_cache", lambda: None)
+    counts = fetcher.bulk_crawl(str(domains_file), str(out), workers=4)
+
+    domains = [record['domain'] for record in iter_records(out)]
+    assert sorted(domains) == sorted(DOMAINS)
+    assert counts['ok'] == len(DOMAINS)
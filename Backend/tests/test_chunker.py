@@ -0,0 +1,95 @@
+import random
+import re
+import threading
+import time
+
+import pytest
+
+import app
+from services.chunker import POLICY_MARKER, _split, chunk_policy_text, estimate_tokens, split_policies
+
+
+def policy(policy_type, paragraphs):
+    """A policy in app.py's combined format, each paragraph tagged with an id"""
+    body = "\n\n".join(
+        f"{i}. Section {policy_type}-{i}. "
+        + " ".join(f"Clause {policy_type}-{i} sentence {j} explains the data practice." for j in range(8))
+        for i in range(1, paragraphs + 1)
+    )
+    return f"\n\n=== {policy_type.upper()} POLICY ===\n\n{body}"
+
+
+TEXT = policy("privacy", 30) + policy("terms", 20) + policy("cookie", 5)
+
+
+def body(chunk):
+    """A chunk without its marker line"""
+    return chunk.split("\n\n", 1)[1]
+
+
+@pytest.mark.parametrize("max_tokens", [60, 200, 1000])
+def test_chunks_fit_the_token_budget(max_tokens):
+    chunks = chunk_policy_text(TEXT, max_tokens)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= max_tokens for _, chunk in chunks)
+
+
+@pytest.mark.parametrize("max_tokens", [60, 200, 1000])
+def test_chunks_cover_the_whole_text(max_tokens):
+    chunks = chunk_policy_text(TEXT, max_tokens)
+    for policy_type, expected in split_policies(TEXT):
+        pieces = [body(chunk) for t, chunk in chunks if t == policy_type]
+        assert " ".join(pieces).split() == expected.split()
+
+
+def test_chunks_never_span_two_policies():
+    for policy_type, chunk in chunk_policy_text(TEXT, 200):
+        assert chunk.startswith(f"=== {policy_type.upper()} POLICY")
+        assert not POLICY_MARKER.search(body(chunk))
+
+
+def test_split_is_lossless():
+    text = "word " * 500 + "x" * 3000 + "\n\nA NEW HEADING\nmore text. " * 20
+    pieces = _split(text, 50)
+    assert "".join(pieces) == text
+    assert all(estimate_tokens(p) <= 50 for p in pieces)
+
+
+def test_condense_keeps_document_order(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_complete(messages, validate=None, **params):
+        # Finish out of order: the reduce step must not depend on timing
+        time.sleep(random.uniform(0, 0.02))
+        chunk = messages[-1]["content"]
+        with lock:
+            calls.append(chunk)
+        return " ".join(dict.fromkeys(re.findall(r"Section (\w+-\d+)", chunk)))
+
+    monkeypatch.setattr(app, "complete", fake_complete)
+    condensed = app.condense_policy_text(TEXT, max_tokens=1000)
+
+    assert len(calls) == len(chunk_policy_text(TEXT, 1000))
+    assert estimate_tokens(condensed) <= 1000
+    # Notes are grouped under their policy's marker, in document order
+    assert [t for t, _ in split_policies(condensed)] == ["privacy", "terms", "cookie"]
+    assert re.findall(r"\w+-\d+", condensed) == re.findall(r"Section (\w+-\d+)", TEXT)
+
+
+def test_condense_leaves_short_text_alone(monkeypatch):
+    monkeypatch.setattr(app, "complete", lambda *a, **k: pytest.fail("no LLM call expected"))
+    text = policy("privacy", 2)
+    assert app.condense_policy_text(text, max_tokens=1000) == text
+
+
+def test_condense_skips_failed_chunks(monkeypatch):
+    def fake_complete(messages, validate=None, **params):
+        chunk = messages[-1]["content"]
+        if "TERMS" in chunk.partition("\n")[0]:
+            raise RuntimeError("LLM down")
+        return " ".join(dict.fromkeys(re.findall(r"Section (\w+-\d+)", chunk)))
+
+    monkeypatch.setattr(app, "complete", fake_complete)
+    condensed = app.condense_policy_text(TEXT, max_tokens=1000)
+    assert [t for t, _ in split_policies(condensed)] == ["privacy", "cookie"]
@@ -0,0 +1,52 @@
+import policy_fetcher_safe as fetcher
+from services.http_cache import HttpCache
+
+URL = "https://example.com/privacy"
+HTML = "<html><body><h1>Privacy Policy</h1><p>" + "We collect personal data. " * 60 + "</p></body></html>"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+
+    def iter_bytes(self, size):
+        yield self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_304_without_cached_text_refetches(tmp_path, monkeypatch):
+    cache = HttpCache(directory=tmp_path)
+    cache.put(URL, "old text", "old-hash", etag='"v1"')
+    cache._text_path(URL).unlink()  # evicted or deleted behind the index's back
+
+    session = FakeSession(
+        FakeResponse(304),
+        FakeResponse(200, HTML.encode(), {"Content-Type": "text/html", "ETag": '"v2"'}),
+    )
+    monkeypatch.setattr(fetcher, "http_session", lambda: session)
+    monkeypatch.setattr(fetcher, "http_cache", lambda: cache)
+
+    outcome = fetcher.fetch_static(URL)
+
+    assert outcome.status == 200
+    assert outcome.ok
+    assert session.requests[0] == {"If-None-Match": '"v1"'}
+    assert session.requests[1] == {}
+    assert cache.get(URL)["etag"] == '"v2"'
@@ -0,0 +1,53 @@
+import time
+
+from services.http_cache import HttpCache
+
+URL = "https://example.com/privacy"
+
+
+def test_index_survives_restart_with_last_used(tmp_path):
+    cache = HttpCache(directory=tmp_path)
+    cache.put(URL, "policy text", "hash", etag='"v1"')
+    time.sleep(0.01)
+    used = cache.get(URL)['last_used']
+    cache.flush(force=True)
+
+    reopened = HttpCache(directory=tmp_path)
+    assert reopened.get(URL)['etag'] == '"v1"'
+    assert reopened.index[URL]['last_used'] >= used
+    assert reopened.get_text(URL) == "policy text"
+
+
+def test_puts_are_batched(tmp_path):
+    cache = HttpCache(directory=tmp_path, flush_interval=3600)
+    cache.put(URL, "first", "h1")  # first flush is immediate
+    for i in range(50):
+        cache.put(f"{URL}/{i}", "text", f"h{i}")
+    assert not (tmp_path / "index.json").exists()
+    assert len((tmp_path / "index.log").read_text().splitlines()) == 1
+
+    cache.flush(force=True)
+    assert len(HttpCache(directory=tmp_path).index) == 51
+
+
+def test_lru_eviction_uses_last_lookup(tmp_path):
+    cache = HttpCache(directory=tmp_path, max_bytes=10)
+    cache.put("https://a.test/", "aaaa", "a")
+    cache.put("https://b.test/", "bbbb", "b")
+    cache.get("https://a.test/")  # a is now the most recently used
+    cache.put("https://c.test/", "cccc", "c")
+
+    assert cache.get("https://b.test/") is None
+    assert cache.get_text("https://a.test/") == "aaaa"
+    assert cache.stats()['size_kb'] * 1024 == 8
+
+
+def test_missing_text_drops_entry(tmp_path):
+    cache = HttpCache(directory=tmp_path)
+    cache.put(URL, "text", "hash")
+    cache._text_path(URL).unlink()
+
+    assert cache.get_text(URL) is None
+    assert cache.get(URL) is None
+    cache.flush(force=True)
+    assert URL not in HttpCache(directory=tmp_path).index
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from services.llm_cache import LLMCache, make_key
+from services.llm_router import LLMEndpoint, LLMRouter
+
+MESSAGES = [
+    {"role": "system", "content": "Summarize the policy."},
+    {"role": "user", "content": "We collect   your data.\n"},
+]
+PARAMS = {"temperature": 0.3, "max_tokens": 2000}
+
+
+def key(model="perplexity:sonar", messages=MESSAGES, params=PARAMS, version="v1"):
+    return make_key(model, messages, params, version)
+
+
+@pytest.mark.parametrize("changed", [
+    {"model": "perplexity:sonar-pro"},
+    {"version": "v2"},
+    {"params": dict(PARAMS, temperature=0.2)},
+    {"params": dict(PARAMS, response_format={"type": "json_object"})},
+    {"messages": [MESSAGES[0], {"role": "user", "content": "We sell your data."}]},
+    {"messages": [{"role": "system", "content": "Summarize briefly."}, MESSAGES[1]]},
+])
+def test_key_changes_with_every_input(changed):
+    assert key(**changed) != key()
+
+
+def test_key_ignores_layout_and_param_order():
+    relaid = [MESSAGES[0], {"role": "user", "content": "  We collect your\tdata."}]
+    assert key(messages=relaid) == key()
+    assert key(params={"max_tokens": 2000, "temperature": 0.3}) == key()
+
+
+def test_router_models_name_each_endpoint():
+    def router(*base_urls):
+        return LLMRouter([LLMEndpoint(f"e{i}", url, "sonar") for i, url in enumerate(base_urls)])
+
+    perplexity = router("https://api.perplexity.ai").models
+    assert router("http://localhost:8000/v1").models != perplexity
+    assert router("https://api.perplexity.ai", "http://localhost:8000/v1").models != perplexity
+
+
+def test_lru_bound(tmp_path):
+    cache = LLMCache(tmp_path / "llm_cache.json", max_entries=3)
+    for name in "abc":
+        cache.set(name, name.upper())
+    assert cache.get("a") == "A"  # now most recently used
+    cache.set("d", "D")
+
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.get("b") is None
+    assert cache.stats()["entries"] == 3
+
+
+def test_writes_are_batched(tmp_path):
+    cache = LLMCache(tmp_path / "llm_cache.json", flush_interval=3600)
+    for i in range(50):
+        cache.set(f"k{i}", f"reply {i}")
+    assert not cache.log_file.exists()
+    assert not cache.storage_file.exists()
+
+    cache.flush(force=True)
+    lines = cache.log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 50
+    assert not cache.storage_file.exists()  # appended, not rewritten
+
+
+def test_log_replays_contents_and_lru_order(tmp_path):
+    path = tmp_path / "llm_cache.json"
+    cache = LLMCache(path, max_entries=3, flush_interval=3600)
+    for name in "abc":
+        cache.set(name, name.upper())
+    cache.flush(force=True)
+    cache.get("a")
+    cache.set("d", "D")  # evicts b
+    cache.flush(force=True)
+
+    reloaded = LLMCache(path, max_entries=3)
+    assert list(reloaded.entries) == ["c", "a", "d"]
+    assert reloaded.get("a") == "A"
+    assert reloaded.get("b") is None
+
+    # A lookup is logged as its key alone, not a copy of the reply
+    touch = json.loads(cache.log_file.read_text(encoding="utf-8").splitlines()[3])
+    assert touch == {"key": "a"}
+
+
+def test_log_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(LLMCache, "MIN_COMPACT_LINES", 5)
+    path = tmp_path / "llm_cache.json"
+    cache = LLMCache(path, flush_interval=0)
+    for i in range(6):
+        cache.set("k", f"reply {i}")
+
+    assert not cache.log_file.exists()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"k": cache.entries["k"]}
+    assert LLMCache(path).get("k") == "reply 5"
+
+
+def test_torn_log_line_is_skipped(tmp_path):
+    path = tmp_path / "llm_cache.json"
+    cache = LLMCache(path, flush_interval=0)
+    cache.set("a", "A")
+    with open(cache.log_file, "a", encoding="utf-8") as f:
+        f.write('{"key":"b","entry":{"cont')
+
+    assert LLMCache(path).get("a") == "A"
@@ -0,0 +1,105 @@
+from concurrent.futures import Future
+
+import pytest
+
+import policy_fetcher_safe as fetcher
+from services.policy_classifier import PolicyClassifier
+
+PAGES = {
+    "privacy": (
+        "Privacy Policy. This privacy policy explains how we process personal data. "
+        "Our data protection officer answers questions about data privacy. "
+        "We use cookies as described in our cookie policy."
+    ),
+    "terms": (
+        "Terms of Service. By using the site you accept these terms of use and the "
+        "terms and conditions below. This user agreement covers acceptable use. "
+        "See the privacy policy for how we handle personal data."
+    ),
+    "cookies": (
+        "Cookie Policy. We and our partners use cookies and similar tracking "
+        "technologies. You can manage each cookie in the settings; cookies are "
+        "covered in the privacy notice."
+    ),
+    "code_of_conduct": (
+        "Code of Conduct. We expect respectful behavior from every member. "
+        "Unacceptable behavior and breaches of our ethics rules are reported to "
+        "the moderators. This code of conduct supplements the terms."
+    ),
+}
+
+
+def old_counts(text):
+    """The per-keyword substring counting the classifier replaced"""
+    lower = text.lower()
+    return {t: sum(lower.count(k) for k in words) for t, words in fetcher.KEYWORDS.items()}
+
+
+def best_type(scores):
+    return max(scores, key=scores.get)
+
+
+@pytest.mark.parametrize("expected", list(PAGES))
+def test_scores_agree_with_per_keyword_counting(expected):
+    text = PAGES[expected]
+    old = old_counts(text)
+    result = fetcher.classify(text)
+
+    # The same types match, and the page's best type is unchanged
+    assert {t for t, n in old.items() if n} == {t for t in result.scores if result.matches_type(t)}
+    assert best_type(result.scores) == best_type(old) == expected
+
+
+def test_bot_page_detection():
+    assert fetcher.is_bot_page("Just a moment... Checking your browser before accessing. Ray ID: 7f")
+    assert not fetcher.is_bot_page(PAGES["privacy"])
+    # A bot phrase flags the page without scoring any policy type
+    result = PolicyClassifier(fetcher.KEYWORDS, fetcher.BOT_PHRASES).classify("Security check")
+    assert result.bot_page
+    assert not any(result.scores.values())
+
+
+def test_longest_phrase_wins_and_counts_once():
+    classifier = PolicyClassifier(fetcher.KEYWORDS, fetcher.BOT_PHRASES)
+    result = classifier.classify("PRIVACY POLICY and Terms of Service", keep_positions=True)
+
+    # "privacy policy" is one two-word match, not also "privacy"
+    assert result.positions == [(0, 14, "privacy policy"), (19, 35, "terms of service")]
+    assert result.score("privacy") == 2
+    assert result.score("terms") == 3
+
+
+def test_positions_are_opt_in():
+    classifier = PolicyClassifier(fetcher.KEYWORDS, fetcher.BOT_PHRASES)
+    assert classifier.classify(PAGES["terms"]).positions == []
+    assert classifier.classify(PAGES["terms"], keep_positions=True).positions
+
+
+def test_recent_classifications_are_reused():
+    fetcher.classify.cache_clear()
+    text = PAGES["cookies"]
+
+    assert not fetcher.is_bot_page(text)
+    assert fetcher.contains_keywords(text, "cookies")
+    assert not fetcher.contains_keywords(text, "code_of_conduct")
+
+    info = fetcher.classify.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_resolve_prefers_the_highest_score(monkeypatch):
+    monkeypatch.setattr(fetcher, "STRONG_MATCH_SCORE", 10)
+    urls = ["/a", "/b", "/c"]
+
+    # Weak matches wait for every probe; the best score wins, earlier on ties
+    assert fetcher._resolve(urls, [done(("a", 2)), done(("b", 5)), done(("c", 5))]) == (True, ("/b", "b"))
+    assert fetcher._resolve(urls, [done(("a", 2)), done(None), Future()]) == (False, None)
+
+    # A strong match wins as soon as the probes ahead of it are known
+    assert fetcher._resolve(urls, [done(None), done(("b", 12)), Future()]) == (True, ("/b", "b"))
@@ -0,0 +1,193 @@
+import pytest
+
+from services import rate_limiter
+from services.rate_limiter import (LLMRateLimitError, LLMUnavailableError, RateLimiter, TokenBucket,
+                                   classify_error)
+
+
+class FakeClock:
+    """time.monotonic/time.sleep that only move when slept on"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeRandom:
+    """random.uniform pinned to one end of its range"""
+
+    def __init__(self, end):
+        self.end = end
+        self.ranges = []
+
+    def uniform(self, low, high):
+        self.ranges.append((low, high))
+        return high if self.end == "high" else low
+
+
+class APIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def failing(*errors, result="ok"):
+    """fn for RateLimiter.call: raises each error in turn, then returns result"""
+    errors = list(errors)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+    fn.attempts = attempts
+    return fn
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_bucket_refills_continuously(clock):
+    bucket = TokenBucket(600)  # 10 per second
+    bucket.take(600)
+    assert bucket.wait_time(60, clock.now) == pytest.approx(6)
+
+    clock.sleep(3)
+    assert bucket.wait_time(60, clock.now) == pytest.approx(3)
+
+    clock.sleep(3600)  # refills up to capacity, no further
+    assert bucket.wait_time(600, clock.now) == 0
+    assert bucket.level == 600
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket(0)
+    bucket.take(10 ** 6)
+    assert bucket.wait_time(10 ** 6, clock.now) == 0
+
+
+def test_requests_wait_for_refill(clock):
+    limiter = RateLimiter("test", requests_per_minute=60)
+    for _ in range(60):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    limiter.acquire()  # one request refills every second
+    assert sum(clock.sleeps) == pytest.approx(1)
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_settle_charges_overuse_to_the_next_caller(clock):
+    limiter = RateLimiter("test", requests_per_minute=0, tokens_per_minute=6000)
+    limiter.acquire(6000)
+    limiter.settle(6000, 6600)  # used 600 more than reserved
+
+    limiter.acquire(100)
+    assert sum(clock.sleeps) == pytest.approx(7)  # the 600 overdraft plus the 100 requested
+    assert limiter.stats()["tokens"] == 6700
+
+
+def test_429_retries_with_jittered_backoff(clock, monkeypatch):
+    jitter = FakeRandom("high")
+    monkeypatch.setattr(rate_limiter, "random", jitter)
+    limiter = RateLimiter("test", requests_per_minute=0, base_delay=1, max_delay=30)
+    fn = failing(APIError(429), APIError(429))
+
+    assert limiter.call(fn) == "ok"
+    assert len(fn.attempts) == 3
+    # Half of each exponential cap is fixed, the other half jittered
+    assert jitter.ranges == [(0, 0.5), (0, 1.0)]
+    assert sum(clock.sleeps) == pytest.approx(1 + 2)
+    assert limiter.stats()["rate_limited"] == 2
+    assert limiter.stats()["retries"] == 2
+
+
+def test_backoff_stays_within_its_jitter_range(monkeypatch):
+    limiter = RateLimiter("test", base_delay=1, max_delay=8)
+    for end in ("low", "high"):
+        monkeypatch.setattr(rate_limiter, "random", FakeRandom(end))
+        delays = [limiter._backoff(attempt) for attempt in range(6)]
+        caps = [1, 2, 4, 8, 8, 8]
+        expected = [cap / 2 for cap in caps] if end == "low" else caps
+        assert delays == expected
+
+
+def test_retry_after_overrides_backoff(clock):
+    limiter = RateLimiter("test", requests_per_minute=0)
+    assert limiter.call(failing(APIError(429, retry_after="7"))) == "ok"
+    assert sum(clock.sleeps) == pytest.approx(7)
+
+    clock.sleeps.clear()
+    assert limiter.call(failing(APIError(503, retry_after="2"))) == "ok"
+    assert clock.sleeps == [2]
+
+
+def test_429_pauses_every_caller(clock):
+    limiter = RateLimiter("test", requests_per_minute=0, max_retries=0)
+    with pytest.raises(LLMRateLimitError):
+        limiter.call(failing(APIError(429, retry_after="5")))
+    assert limiter.stats()["paused_for"] == 5
+
+    limiter.acquire()  # another caller waits out the pause
+    assert sum(clock.sleeps) == pytest.approx(5)
+
+
+def test_exhausted_retries_raise_typed_errors(clock):
+    limiter = RateLimiter("test", requests_per_minute=0, max_retries=2)
+
+    with pytest.raises(LLMRateLimitError) as excinfo:
+        limiter.call(failing(*[APIError(429, retry_after="3")] * 3))
+    assert excinfo.value.retry_after == 3
+    assert isinstance(excinfo.value.__cause__, APIError)
+
+    fn = failing(*[APIError(502)] * 3)
+    with pytest.raises(LLMUnavailableError):
+        limiter.call(fn)
+    assert len(fn.attempts) == 3
+
+    with pytest.raises(LLMUnavailableError):
+        limiter.call(failing(*[ConnectionError("reset")] * 3))
+
+
+def test_caller_errors_are_not_retried(clock):
+    limiter = RateLimiter("test", requests_per_minute=0)
+    fn = failing(APIError(400))
+    with pytest.raises(APIError):
+        limiter.call(fn)
+    assert len(fn.attempts) == 1
+    assert clock.sleeps == []
+
+
+def test_budget_beyond_max_wait_is_rejected(clock):
+    limiter = RateLimiter("test", requests_per_minute=1, max_wait=10)
+    limiter.acquire()
+    with pytest.raises(LLMRateLimitError) as excinfo:
+        limiter.acquire()
+    assert excinfo.value.retry_after == pytest.approx(60)
+    assert clock.sleeps == []  # rejected up front, not after waiting
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize("error, expected", [
+    (APIError(429, retry_after="4"), ("rate_limited", 4)),
+    (APIError(500), ("unavailable", None)),
+    (APIError(408), ("unavailable", None)),
+    (TimeoutError(), ("unavailable", None)),
+    (APIError(401), (None, None)),
+    (ValueError(), (None, None)),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from services import single_flight
+from services.single_flight import FileLockSingleFlight, SingleFlight
+
+N = 8
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def run_concurrently(flight, key, fn, n=N):
+    """n threads call flight.do(key, fn); returns their (result, shared) or exception"""
+    outcomes = [None] * n
+
+    def worker(i):
+        try:
+            outcomes[i] = flight.do(key, fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+class SlowFetch:
+    """fn for do(): counts calls and blocks until released"""
+
+    def __init__(self, result="page", error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_misses_fetch_once():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    threads, outcomes = run_concurrently(flight, "example.com", fetch)
+
+    # Every follower is waiting on the leader before it finishes
+    wait_for(lambda: flight.stats()["waiting"] == N - 1)
+    fetch.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert [result for result, _ in outcomes] == ["page"] * N
+    assert sorted(shared for _, shared in outcomes) == [False] + [True] * (N - 1)
+    assert flight.stats() == {"in_flight": 0, "waiting": 0}
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight()
+    error = ValueError("fetch failed")
+    fetch = SlowFetch(error=error)
+    threads, outcomes = run_concurrently(flight, "example.com", fetch)
+
+    wait_for(lambda: flight.stats()["waiting"] == N - 1)
+    fetch.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_results_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+    assert flight.do("k", lambda: calls.append(1) or len(calls)) == (1, False)
+    assert flight.do("k", lambda: calls.append(1) or len(calls)) == (2, False)
+
+
+def test_follower_gives_up_after_timeout():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    leader = threading.Thread(target=flight.do, args=("k", fetch))
+    leader.start()
+    wait_for(lambda: fetch.calls == 1)
+
+    assert flight.do("k", lambda: "own", timeout=0.05) == ("own", False)
+    fetch.release.set()
+    leader.join()
+
+
+needs_fcntl = pytest.mark.skipif(single_flight.fcntl is None, reason="flock needs POSIX")
+
+
+@needs_fcntl
+def test_lock_file_serializes_workers(tmp_path):
+    # flock locks belong to an open file, so two instances in one process
+    # contend for a key exactly like two gunicorn workers
+    first, second = FileLockSingleFlight(str(tmp_path)), FileLockSingleFlight(str(tmp_path), poll_interval=0.01)
+    saved = {}
+    fetch = SlowFetch()
+
+    def first_worker():
+        saved["k"] = first.do("k", fetch)[0]
+
+    leader = threading.Thread(target=first_worker)
+    leader.start()
+    wait_for(lambda: fetch.calls == 1)
+
+    seconds = []
+    follower = threading.Thread(target=lambda: seconds.append(
+        second.do("k", lambda: pytest.fail("second worker fetched"), recheck=lambda: saved.get("k"))))
+    follower.start()
+    time.sleep(0.1)
+    assert not seconds  # blocked on the lock file while the first worker fetches
+
+    fetch.release.set()
+    leader.join()
+    follower.join()
+    assert fetch.calls == 1
+    assert seconds == [("page", False)]  # the saved result, found by recheck
+    assert list(tmp_path.glob("*.lock"))
+
+
+@needs_fcntl
+def test_lock_file_wait_times_out(tmp_path):
+    first, second = FileLockSingleFlight(str(tmp_path)), FileLockSingleFlight(str(tmp_path), poll_interval=0.01)
+    fetch = SlowFetch()
+    leader = threading.Thread(target=first.do, args=("k", fetch))
+    leader.start()
+    wait_for(lambda: fetch.calls == 1)
+
+    assert second.do("k", lambda: "own", timeout=0.05) == ("own", False)
+    fetch.release.set()
+    leader.join()